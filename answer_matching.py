@@ -0,0 +1,136 @@
+"""
+Moduł dopasowywania odpowiedzi - porównuje odpowiedzi graczy z poprawną
+odpowiedzią z tolerancją na wielkość liter, polskie znaki, literówki i aliasy
+"""
+
+import re
+import unicodedata
+from typing import Dict, FrozenSet, Iterable, Tuple
+
+# Litery, których NFKD nie rozkłada na literę bazową i znak diakrytyczny
+_SPECIAL_LETTERS = str.maketrans({
+    "ł": "l", "Ł": "l", "ø": "o", "Ø": "o", "đ": "d", "Đ": "d",
+    "ß": "ss", "æ": "ae", "Æ": "ae", "œ": "oe", "Œ": "oe",
+})
+_NON_ALNUM = re.compile(r"[^\w]+|_")
+_CACHE_LIMIT = 1024  # Maksymalna liczba zapamiętanych wyników na pytanie
+
+# Separatory aliasów w jednej komórce arkusza
+ALIAS_SEPARATORS = re.compile(r"[;|\n]")
+
+# Samo nazwisko z wielowyrazowej odpowiedzi ("edison", "da vinci") - tylko ostatni wyraz,
+# z poprzedzającymi go przedrostkami nazwisk, i nie krótszy niż MIN_SURNAME_LENGTH liter
+MIN_SURNAME_LENGTH = 4
+SURNAME_PARTICLES = frozenset({"da", "de", "del", "della", "di", "du", "la", "le", "van", "von", "der", "den"})
+
+
+def fold_diacritics(text: str) -> str:
+    """Usuwa znaki diakrytyczne (paryż -> paryz, łódź -> lodz)"""
+    text = text.translate(_SPECIAL_LETTERS)
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def normalize_answer(text: str) -> str:
+    """Sprowadza odpowiedź do postaci porównywalnej: małe litery, bez diakrytyków i interpunkcji"""
+    folded = fold_diacritics(text.casefold())
+    return " ".join(_NON_ALNUM.sub(" ", folded).split())
+
+
+def parse_aliases(value) -> Tuple[str, ...]:
+    """Rozbija komórkę z aliasami ('Paryż; Paris') na krotkę"""
+    if not value:
+        return ()
+    if isinstance(value, (list, tuple)):
+        parts = value
+    else:
+        parts = ALIAS_SEPARATORS.split(str(value))
+    return tuple(part.strip().lower() for part in parts if part and str(part).strip())
+
+
+def surname_forms(form: str) -> Tuple[str, ...]:
+    """Krótsze formy wielowyrazowej odpowiedzi: ostatni wyraz, sam i z przedrostkami"""
+    words = form.split()
+    if len(words) < 2 or len(words[-1]) < MIN_SURNAME_LENGTH or any(char.isdigit() for char in form):
+        return ()
+    forms = [words[-1]]
+    start = len(words) - 1
+    while start > 1 and words[start - 1] in SURNAME_PARTICLES:
+        start -= 1
+        forms.append(" ".join(words[start:]))
+    return tuple(forms)
+
+
+def max_typos(form: str) -> int:
+    """Dopuszczalna liczba literówek zależna od długości odpowiedzi"""
+    if any(char.isdigit() for char in form):
+        return 0  # Liczby i daty muszą się zgadzać dokładnie
+    length = len(form.replace(" ", ""))
+    if length <= 3:
+        return 0
+    if length <= 7:
+        return 1
+    return 2
+
+
+def bounded_distance(a: str, b: str, limit: int) -> int:
+    """Odległość edycyjna (z przestawieniami) albo limit + 1, gdy ją przekracza"""
+    if a == b:
+        return 0
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class AnswerMatcher:
+    """Prekompilowany zestaw poprawnych form odpowiedzi na jedno pytanie"""
+
+    __slots__ = ("answer", "forms", "compact_forms", "_results")
+
+    def __init__(self, answer: str, aliases: Iterable[str] = ()):
+        self.answer = answer
+        forms = {normalize_answer(form) for form in (answer, *aliases)}
+        forms.discard("")
+        for form in list(forms):
+            forms.update(surname_forms(form))
+        self.forms: FrozenSet[str] = frozenset(forms)
+        self.compact_forms: FrozenSet[str] = frozenset(form.replace(" ", "") for form in forms)
+        self._results: Dict[str, bool] = {}
+
+    def matches(self, candidate: str) -> bool:
+        """Sprawdza czy odpowiedź gracza pasuje do którejś z poprawnych form"""
+        result = self._results.get(candidate)
+        if result is None:
+            result = self._match(normalize_answer(candidate))
+            if len(self._results) >= _CACHE_LIMIT:
+                self._results.clear()
+            self._results[candidate] = result
+        return result
+
+    def _match(self, normalized: str) -> bool:
+        if not normalized:
+            return False
+        if normalized in self.forms or normalized.replace(" ", "") in self.compact_forms:
+            return True
+
+        for form in self.forms:
+            limit = max_typos(form)
+            if limit and bounded_distance(normalized, form, limit) <= limit:
+                return True
+        return False
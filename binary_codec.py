@@ -0,0 +1,188 @@
+"""
+Moduł kodowania binarnego - zwarta postać wiadomości sieciowych: jednobajtowe
+znaczniki typów, znane klucze i typy wiadomości jako jeden bajt, długości
+zamiast cudzysłowów oraz powtarzające się napisy (np. nazwy graczy) zapisane raz
+"""
+
+import struct
+from typing import Any, Dict, List, Tuple
+
+BINARY_MAGIC = 0xB1  # Pierwszy bajt ramki binarnej (ramki JSON+zlib zaczynają się od 0x78)
+
+# Znaczniki wartości
+_NONE = 0x00
+_FALSE = 0x01
+_TRUE = 0x02
+_INT = 0x03  # varint ze znakiem (zigzag)
+_FLOAT = 0x04  # double
+_STR = 0x05  # długość + UTF-8; napis trafia do tabeli ramki
+_STR_REF = 0x06  # numer napisu z tabeli ramki
+_LIST = 0x07  # liczba elementów + elementy
+_DICT = 0x08  # liczba par + pary klucz, wartość
+_BYTES = 0x09  # długość + bajty
+_SMALL_INT = 0x40  # 0x40-0x7F: liczby 0-63 w jednym bajcie
+_KNOWN = 0x80  # 0x80-0xFF: napis z KNOWN_STRINGS
+
+# Klucze i typy wiadomości kodowane jednym bajtem - tylko dopisywać na końcu!
+KNOWN_STRINGS = (
+    'type', 'player_name', 'message', 'players', 'players_list', 'version', 'base',
+    'join', 'leave', 'scores', 'round', 'groups', 'answer', 'is_correct', 'removed',
+    'vote', 'data', 'host_ip', 'port', 'compression', 'encoding', 'encodings',
+    'join_success', 'error', 'player_joined', 'player_left', 'state_delta',
+    'state_full', 'sync_request', 'host_snapshot', 'backup_host', 'zlib', 'binary',
+    'json', 'question', 'rank', 'score', 'top', 'around', 'batch', 'messages',
+    'answer_count', 'vote_count', 'progress', 'done', 'total', 'redirect',
+    'create_room', 'seq', 'resume_token', 'resumed', 'last_seq', 'reconnected',
+    'connection_lost', 'ping', 'pong', 'id', 'client_time', 'link_stats',
+    'scoreboard', 'points', 'near', 'total_players', 'round_results', 'game_over',
+    'correct_answer',
+)
+_KNOWN_IDS = {text: index for index, text in enumerate(KNOWN_STRINGS)}
+
+_DOUBLE = struct.Struct("<d")
+
+
+class _Encoder:
+    __slots__ = ("out", "strings")
+
+    def __init__(self):
+        self.out = bytearray([BINARY_MAGIC])
+        self.strings: Dict[str, int] = {}
+
+    def varint(self, value: int):
+        out = self.out
+        while value > 0x7F:
+            out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        out.append(value)
+
+    def value(self, value: Any):
+        out = self.out
+        if value is None:
+            out.append(_NONE)
+        elif value is True:
+            out.append(_TRUE)
+        elif value is False:
+            out.append(_FALSE)
+        elif isinstance(value, str):
+            known = _KNOWN_IDS.get(value)
+            if known is not None:
+                out.append(_KNOWN | known)
+                return
+            index = self.strings.get(value)
+            if index is not None:
+                out.append(_STR_REF)
+                self.varint(index)
+                return
+            self.strings[value] = len(self.strings)
+            data = value.encode("utf-8")
+            out.append(_STR)
+            self.varint(len(data))
+            out += data
+        elif isinstance(value, int):
+            if 0 <= value < 64:
+                out.append(_SMALL_INT | value)
+            else:
+                out.append(_INT)
+                self.varint(value << 1 if value >= 0 else ((-value) << 1) - 1)
+        elif isinstance(value, float):
+            out.append(_FLOAT)
+            out += _DOUBLE.pack(value)
+        elif isinstance(value, dict):
+            out.append(_DICT)
+            self.varint(len(value))
+            for key, item in value.items():
+                self.value(key)
+                self.value(item)
+        elif isinstance(value, (list, tuple)):
+            out.append(_LIST)
+            self.varint(len(value))
+            for item in value:
+                self.value(item)
+        elif isinstance(value, (bytes, bytearray)):
+            out.append(_BYTES)
+            self.varint(len(value))
+            out += value
+        else:
+            raise TypeError(f"Nieobsługiwany typ w wiadomości: {type(value).__name__}")
+
+
+def encode_binary(message: Dict[str, Any]) -> bytes:
+    """Koduje wiadomość do postaci binarnej"""
+    encoder = _Encoder()
+    encoder.value(message)
+    return bytes(encoder.out)
+
+
+def _read_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    result = data[offset]
+    if result < 0x80:
+        return result, offset + 1  # Najczęstszy przypadek: jeden bajt
+    result = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, offset
+        shift += 7
+
+
+def _read_value(data: bytes, offset: int, strings: List[str]) -> Tuple[Any, int]:
+    tag = data[offset]
+    offset += 1
+    if tag >= _KNOWN:
+        return KNOWN_STRINGS[tag & 0x7F], offset
+    if tag >= _SMALL_INT:
+        return tag & 0x3F, offset
+    if tag == _STR_REF:
+        index, offset = _read_varint(data, offset)
+        return strings[index], offset
+    if tag == _STR:
+        length, offset = _read_varint(data, offset)
+        end = offset + length
+        text = data[offset:end].decode("utf-8")
+        strings.append(text)
+        return text, end
+    if tag == _DICT:
+        count, offset = _read_varint(data, offset)
+        result = {}
+        for _ in range(count):
+            key, offset = _read_value(data, offset, strings)
+            result[key], offset = _read_value(data, offset, strings)
+        return result, offset
+    if tag == _LIST:
+        count, offset = _read_varint(data, offset)
+        items = []
+        for _ in range(count):
+            item, offset = _read_value(data, offset, strings)
+            items.append(item)
+        return items, offset
+    if tag == _INT:
+        raw, offset = _read_varint(data, offset)
+        return (raw >> 1) ^ -(raw & 1), offset
+    if tag == _NONE:
+        return None, offset
+    if tag == _TRUE:
+        return True, offset
+    if tag == _FALSE:
+        return False, offset
+    if tag == _FLOAT:
+        return _DOUBLE.unpack_from(data, offset)[0], offset + _DOUBLE.size
+    if tag == _BYTES:
+        length, offset = _read_varint(data, offset)
+        return bytes(data[offset:offset + length]), offset + length
+    raise ValueError(f"Nieznany znacznik wartości: {tag:#x}")
+
+
+def decode_binary(data: bytes) -> Dict[str, Any]:
+    """Dekoduje wiadomość zapisaną przez encode_binary"""
+    if not data or data[0] != BINARY_MAGIC:
+        raise ValueError("To nie jest binarna wiadomość")
+    message, _ = _read_value(data, 1, [])
+    return message
+
+
+def is_binary(data: bytes) -> bool:
+    return bool(data) and data[0] == BINARY_MAGIC
@@ -18,12 +18,16 @@ source.main = main_apk.py
 # (list) Source files to include (let empty to include all the files)
 source.include_exts = py,png,jpg,kv,atlas,xlsx
 
+# (list) List of directory to exclude (let empty to not exclude anything)
+# Testy (pytest) i wyniki budowania nie trafiają do APK
+source.exclude_dirs = tests, bin
+
 # (str) Application versioning (method 1)
 version = 1.0
 
 # (list) Application requirements
 # comma separated e.g. requirements = sqlite3,kivy
-requirements = python3,kivy,kivymd,websockets,openpyxl,et-xmlfile
+requirements = python3,kivy,kivymd,websockets>=14,openpyxl,et-xmlfile
 
 # (str) Supported orientation (landscape, sensorLandscape, portrait, sensorPortrait or all)
 orientation = portrait
@@ -0,0 +1,96 @@
+"""
+Moduł połączenia z klientem - każdy gracz ma własną, ograniczoną kolejkę wysyłki
+i własne zadanie piszące, więc wolny telefon nie opóźnia pozostałych graczy
+"""
+
+import asyncio
+import logging
+
+import websockets
+
+from message_frame import ENCODING_JSON, Frame
+
+logger = logging.getLogger(__name__)
+
+# Polityki dla klienta, którego kolejka się zapełniła
+POLICY_DROP_OLDEST = "drop_oldest"  # Odrzuć najstarszą wiadomość z kolejki
+POLICY_DROP_NEWEST = "drop_newest"  # Odrzuć nową wiadomość
+POLICY_DISCONNECT = "disconnect"  # Rozłącz klienta
+SLOW_CLIENT_POLICIES = (POLICY_DROP_OLDEST, POLICY_DROP_NEWEST, POLICY_DISCONNECT)
+
+
+class ClientConnection:
+    """Kolejka wiadomości wychodzących i zadanie wysyłające dla jednego klienta"""
+
+    def __init__(self, player_name: str, websocket, queue_size: int = 256,
+                 policy: str = POLICY_DROP_OLDEST, send_timeout: float = 10.0,
+                 compress: bool = False, encoding: str = ENCODING_JSON):
+        if policy not in SLOW_CLIENT_POLICIES:
+            raise ValueError(f"Nieznana polityka wolnego klienta: {policy}")
+        self.player_name = player_name
+        self.websocket = websocket
+        self.policy = policy
+        self.send_timeout = send_timeout  # Maksymalny czas wysyłania jednej wiadomości (s)
+        self.compress = compress  # Klient przyjmuje ramki skompresowane zlib
+        self.encoding = encoding  # Kodowanie uzgodnione przy dołączaniu
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0  # Liczba odrzuconych wiadomości
+        self.closed = False
+        self._writer = asyncio.create_task(self._write_loop())
+
+    def enqueue(self, frame: Frame) -> bool:
+        """Dodaje wiadomość do kolejki bez czekania; False, gdy wiadomość nie trafi do klienta"""
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            pass
+
+        if self.policy == POLICY_DISCONNECT:
+            logger.warning(f"Gracz {self.player_name} nie nadąża z odbiorem - rozłączanie")
+            self.close()
+            return False
+        self.dropped += 1
+        if self.policy == POLICY_DROP_NEWEST:
+            return False
+        self.queue.get_nowait()
+        self.queue.put_nowait(frame)
+        return True
+
+    async def _write_loop(self):
+        try:
+            while True:
+                frame = await self.queue.get()
+                await asyncio.wait_for(frame.send(self.websocket, self.compress, self.encoding), self.send_timeout)
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            logger.warning(f"Przekroczono czas wysyłania do {self.player_name} - rozłączanie")
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        except Exception as e:
+            logger.error(f"Błąd wysyłania do {self.player_name}: {e}")
+        # Zamknięcie gniazda kończy obsługę klienta i usuwa go z gry
+        self.closed = True
+        await self._close_websocket()
+
+    async def _close_websocket(self):
+        try:
+            await self.websocket.close()
+        except Exception as e:
+            logger.error(f"Błąd zamykania połączenia z {self.player_name}: {e}")
+
+    def close(self):
+        """Zatrzymuje wysyłanie i zamyka połączenie z klientem"""
+        if self.closed:
+            return
+        self.stop()
+        asyncio.create_task(self._close_websocket())
+
+    def stop(self):
+        """Zatrzymuje zadanie wysyłające (połączenie jest już zamknięte)"""
+        self.closed = True
+        if not self._writer.done():
+            self._writer.cancel()
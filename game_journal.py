@@ -0,0 +1,156 @@
+"""
+Moduł dziennika gry - binarny zapis każdej zmiany stanu GameLogic (tylko dopisywanie),
+pozwalający odtworzyć grę po awarii lub zamknięciu aplikacji przez system
+"""
+
+import os
+import struct
+import threading
+import zlib
+from typing import Iterator, List, Sequence, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Typy rekordów
+REC_START = 1  # pytania gry
+REC_ANSWER = 2  # gracz, odpowiedź
+REC_VOTING = 3  # lista graczy przy zamknięciu odpowiedzi
+REC_VOTE = 4  # gracz, głos
+REC_SCORE = 5  # lista graczy przy liczeniu punktów
+REC_NEXT = 6  # następne pytanie
+REC_RESET = 7  # reset gry, pytania następnej gry
+REC_REMOVE = 8  # gracz rozłączony w trakcie rundy
+
+_HEADER = struct.Struct("<BI")  # typ, długość danych
+_CRC = struct.Struct("<I")
+_STR_LEN = struct.Struct("<H")
+_COUNT = struct.Struct("<I")
+
+
+def _pack_str(text: str) -> bytes:
+    data = text.encode("utf-8")
+    if len(data) > 0xFFFF:
+        # Przytnij na granicy znaku - ucięty znak UTF-8 uniemożliwiłby odtworzenie dziennika
+        data = data[:0xFFFF].decode("utf-8", "ignore").encode("utf-8")
+    return _STR_LEN.pack(len(data)) + data
+
+
+def pack_strings(values: Sequence[str]) -> bytes:
+    """Koduje listę napisów: liczba elementów + napisy z długością"""
+    return _COUNT.pack(len(values)) + b"".join(_pack_str(value) for value in values)
+
+
+def unpack_strings(payload: bytes) -> List[str]:
+    """Dekoduje listę napisów zapisaną przez pack_strings"""
+    (count,) = _COUNT.unpack_from(payload)
+    offset = _COUNT.size
+    values = []
+    for _ in range(count):
+        (length,) = _STR_LEN.unpack_from(payload, offset)
+        offset += _STR_LEN.size
+        values.append(payload[offset:offset + length].decode("utf-8"))
+        offset += length
+    return values
+
+
+def encode_record(record_type: int, payload: bytes = b"") -> bytes:
+    """Składa rekord: nagłówek, dane i suma kontrolna"""
+    header = _HEADER.pack(record_type, len(payload))
+    return header + payload + _CRC.pack(zlib.crc32(header + payload))
+
+
+def read_journal(path: str) -> Iterator[Tuple[int, bytes]]:
+    """Czyta kolejne rekordy, zatrzymując się na uciętym lub uszkodzonym końcu"""
+    with open(path, "rb") as f:
+        data = f.read()
+    offset = 0
+    while offset + _HEADER.size <= len(data):
+        record_type, length = _HEADER.unpack_from(data, offset)
+        end = offset + _HEADER.size + length
+        if end + _CRC.size > len(data):
+            logger.warning(f"Ucięty rekord na końcu dziennika {path}")
+            return
+        (crc,) = _CRC.unpack_from(data, end)
+        if crc != zlib.crc32(data[offset:end]):
+            logger.warning(f"Uszkodzony rekord w dzienniku {path} (offset {offset})")
+            return
+        yield record_type, data[offset + _HEADER.size:end]
+        offset = end + _CRC.size
+
+
+class GameJournal:
+    """Dziennik zmian stanu gry z zapisem w tle i grupowym fsync"""
+
+    def __init__(self, path: str, flush_interval: float = 0.05):
+        self.path = path
+        self.flush_interval = flush_interval  # Maksymalne opóźnienie zapisu na dysk (s)
+        self._buffer = bytearray()
+        self._condition = threading.Condition()
+        self._io_lock = threading.Lock()  # Porządkuje zapisy i obcinanie pliku
+        self._closed = False
+        self._file = open(path, "ab")
+        self._writer = threading.Thread(target=self._write_loop, name="game-journal", daemon=True)
+        self._writer.start()
+
+    def append(self, record_type: int, payload: bytes = b""):
+        """Dodaje rekord do bufora (bez operacji dyskowych w wątku wywołującym)"""
+        record = encode_record(record_type, payload)
+        with self._condition:
+            if self._closed:
+                return
+            if not self._buffer:
+                self._condition.notify()
+            self._buffer += record
+
+    def _write_pending(self):
+        with self._io_lock:
+            with self._condition:
+                pending = bytes(self._buffer)
+                self._buffer.clear()
+            if pending:
+                self._file.write(pending)
+                self._file.flush()
+                os.fsync(self._file.fileno())
+
+    def _write_loop(self):
+        while True:
+            with self._condition:
+                # Bez zapisów wątek śpi; pierwszy rekord otwiera okno grupowania
+                while not self._buffer and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    break
+                self._condition.wait(self.flush_interval)
+            try:
+                self._write_pending()
+            except Exception as e:
+                logger.error(f"Błąd zapisu dziennika gry: {e}")
+
+    def begin_game(self, payload: bytes):
+        """Rozpoczyna nowy dziennik od rekordu startu gry (poprzednia gra jest zbędna)"""
+        with self._io_lock:
+            with self._condition:
+                self._buffer.clear()
+                self._buffer += encode_record(REC_START, payload)
+            self._file.seek(0)
+            self._file.truncate()
+        self.flush()
+
+    def flush(self):
+        """Zapisuje bufor na dysk natychmiast"""
+        try:
+            self._write_pending()
+        except Exception as e:
+            logger.error(f"Błąd zapisu dziennika gry: {e}")
+
+    def close(self):
+        """Zapisuje resztę bufora i zamyka dziennik"""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        self._writer.join()
+        self.flush()
+        self._file.close()
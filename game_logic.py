@@ -2,57 +2,162 @@
 Moduł logiki gry - zarządza pytaniami, odpowiedziami i punktacją
 """
 
-import openpyxl
 import random
-from typing import Dict, List, Tuple, Optional, Any
+import json
+import struct
+import zlib
+from array import array
+from typing import Dict, List, Mapping, Set, Tuple, Optional, Any
 import os
 import logging
 
+import question_cache
+from answer_matching import AnswerMatcher
+from question_packs import Question, QuestionSource, get_bank_path, iter_pack_questions, load_packs, resolve_pack_files
+from question_store import QuestionStore
+from question_pool import QuestionPool, get_shared_pool
+import game_journal
+from game_journal import GameJournal
+from leaderboard import Leaderboard
+from question_rotation import QuestionRotation, get_rotation_path
+from round_state import (NO_ANSWER, AnswerGroup, PlayerTable, RoundColumnView, RoundState,
+                         ScoreTable, ScoresView)
+
 logger = logging.getLogger(__name__)
 
+SNAPSHOT_MAGIC = b"QPS"
+SNAPSHOT_VERSION = 1
+_SNAPSHOT_HEADER = struct.Struct("<3sB")  # magia, wersja
+MAX_LATENCY_ALLOWANCE = 1.0  # Najdłuższe wydłużenie czasu na odpowiedź z powodu opóźnień łącza (s)
+
 class GameLogic:
     """Zarządza logiką gry quiz"""
     
-    def __init__(self, questions_file: str = "questions.xlsx"):
-        self.questions_file = questions_file
-        self.questions: List[Tuple[str, str]] = []  # (pytanie, odpowiedź)
+    def __init__(self, questions_file: QuestionSource = "questions.xlsx", question_count: int = 25,
+                 streaming: bool = False, use_store: bool = False,
+                 rotate_questions: bool = False):
+        self.questions_file = questions_file  # Plik, katalog z paczkami lub lista paczek
+        self.bank_path = get_bank_path(questions_file)  # Baza nazw plików cache i rotacji
+        self.pack_files: List[str] = []
+        self.question_count = question_count  # Liczba pytań w jednej grze
+        self.streaming = streaming  # Losowanie w jednym przebiegu dla dużych baz
+        self.question_store: Optional[QuestionStore] = None  # Indeksowana baza SQLite
+        self.question_filters: Dict[str, Any] = {}  # category, difficulty, language
+        if use_store:
+            if not isinstance(questions_file, str) or os.path.isdir(questions_file):
+                raise ValueError("Baza SQLite wymaga pojedynczego skoroszytu")
+            self.question_store = QuestionStore(QuestionStore.path_for_workbook(questions_file))
+        self.question_pool = QuestionPool(())  # Wspólna, niezmienna pula (pytanie, odpowiedź)
+        self.question_order = array('I')  # Indeksy pytań tej gry w puli
+        self.rotate_questions = rotate_questions  # Najpierw pytania jeszcze nie zadane (host/serwer)
+        self.question_rotation: Optional[QuestionRotation] = None
         self.current_question_index = 0
-        self.player_scores: Dict[str, int] = {}
-        self.current_answers: Dict[str, str] = {}  # gracz -> odpowiedź
-        self.current_votes: Dict[str, str] = {}  # gracz -> na co głosuje
+        # Gracze jako numery, odpowiedzi/głosy/wyniki w tablicach indeksowanych numerem gracza
+        self.players = PlayerTable()
+        self.scores = ScoreTable()
+        self.round = RoundState()
+        self.player_scores: Mapping[str, int] = ScoresView(self.players, self.scores)
+        self.leaderboard = Leaderboard()  # Ranking aktualizowany po każdej rundzie
+        self.current_answers: Mapping[str, str] = RoundColumnView(self.players, self.round)  # gracz -> odpowiedź
+        self.current_votes: Mapping[str, str] = RoundColumnView(self.players, self.round, votes=True)  # gracz -> na co głosuje
+        self._grouped_view: Optional[List[Dict[str, Any]]] = None
+        self._changed_groups: Dict[int, None] = {}  # numery tekstów zmienionych grup
+        self.votes_outstanding = 0  # Uprawnieni gracze, którzy jeszcze nie zagłosowali
+        self.away_players: Set[int] = set()  # Rozłączeni, czekający na wznowienie - nie wstrzymują rundy
         self.correct_answer = ""
+        self.answer_matcher: Optional[AnswerMatcher] = None  # Formy poprawnej odpowiedzi
         self.game_phase = "waiting"  # waiting, answering, voting, results
+        self.journal: Optional[GameJournal] = None  # Dziennik zmian stanu (odtwarzanie po awarii)
+        self.link_rtts: Dict[str, float] = {}  # gracz -> czas odpowiedzi łącza (s), z raportu hosta
         
         self.load_questions()
     
     def load_questions(self):
-        """Ładuje pytania z pliku Excel"""
+        """Ładuje pytania z pliku Excel lub paczek pytań"""
         try:
-            if not os.path.exists(self.questions_file):
+            if isinstance(self.questions_file, str) and not os.path.exists(self.questions_file):
                 self.create_default_questions()
+            self.pack_files = resolve_pack_files(self.questions_file)
             
-            workbook = openpyxl.load_workbook(self.questions_file)
-            sheet = workbook.active
-            
-            self.questions = []
-            for row in sheet.iter_rows(min_row=2, values_only=True):  # Pomijamy nagłówek
-                if row[0] and row[1]:  # Sprawdź czy pytanie i odpowiedź nie są puste
-                    question = str(row[0]).strip()
-                    answer = str(row[1]).strip().lower()  # Normalizuj odpowiedź
-                    self.questions.append((question, answer))
-            
-            # Wymieszaj pytania
-            random.shuffle(self.questions)
-            
-            # Ogranicz do 20-30 pytań
-            self.questions = self.questions[:25]
+            if self.question_store is not None:
+                # Import tylko po zmianie skoroszytu, losowanie zapytaniem z indeksu
+                self.question_store.import_if_changed(self.questions_file)
+                self.questions = self.question_store.sample(
+                    self.question_count, **self.question_filters)
+            elif self.streaming:
+                # Pamięć zależy tylko od liczby losowanych pytań
+                self.questions = self._sample_questions_from_packs(self.question_count)
+                random.shuffle(self.question_order)
+            else:
+                # Cała baza trzymana raz w procesie, gra losuje tylko indeksy
+                self.question_pool = get_shared_pool(self.pack_files, self._load_question_bank)
+                if self.rotate_questions:
+                    self.question_rotation = QuestionRotation(
+                        get_rotation_path(self.bank_path), len(self.question_pool))
+                self.question_order = self._draw_question_order()
             
-            logger.info(f"Załadowano {len(self.questions)} pytań")
+            logger.info(f"Załadowano {len(self.question_order)} pytań")
             
         except Exception as e:
             logger.error(f"Błąd ładowania pytań: {e}")
             self.create_default_questions()
     
+    @property
+    def questions(self) -> List[Tuple[str, str]]:
+        """Pytania tej gry w kolejności zadawania (kopia, tylko do odczytu)"""
+        return [self.question_pool[index][:2] for index in self.question_order]
+    
+    @questions.setter
+    def questions(self, questions: List[Tuple[str, ...]]):
+        """Ustawia prywatną pulę z podanymi pytaniami"""
+        self.question_pool = QuestionPool(questions)
+        self.question_order = array('I', range(len(self.question_pool)))
+        self.question_rotation = None
+    
+    def _draw_question_order(self) -> array:
+        """Losuje pytania z puli, zaczynając od jeszcze nie zadanych"""
+        pool_size = len(self.question_pool)
+        count = min(self.question_count, pool_size)
+        rotation = self.question_rotation
+        if rotation is None:
+            return array('I', random.sample(range(pool_size), count))
+        
+        hashes = self.question_pool.get_hashes()
+        unseen = [i for i in range(pool_size) if not rotation.is_seen(hashes[i])]
+        if len(unseen) >= count:
+            chosen = random.sample(unseen, count)
+        else:
+            # Bank wyczerpany - dobierz resztę z już zadanych i zacznij od nowa
+            unseen_set = set(unseen)
+            seen = [i for i in range(pool_size) if i not in unseen_set]
+            chosen = unseen + random.sample(seen, count - len(unseen))
+            random.shuffle(chosen)
+            rotation.reset()
+        return array('I', chosen)
+    
+    def _load_question_bank(self) -> List[Question]:
+        """Wczytuje cały bank pytań (połączone paczki bez duplikatów) z cache lub z plików"""
+        cache_path = question_cache.get_cache_path(self.bank_path)
+        questions = question_cache.load_cached_questions(cache_path, self.pack_files)
+        if questions is None:
+            questions = load_packs(self.pack_files)
+            if not questions:
+                raise ValueError("Brak pytań w podanych plikach")
+            question_cache.save_questions_cache_async(cache_path, self.pack_files, questions)
+        return questions
+    
+    def _sample_questions_from_packs(self, count: int) -> List[Question]:
+        """Losuje count pytań w jednym przebiegu (reservoir sampling, bez usuwania duplikatów)"""
+        reservoir: List[Question] = []
+        for seen, question in enumerate(iter_pack_questions(self.pack_files)):
+            if seen < count:
+                reservoir.append(question)
+            else:
+                slot = random.randint(0, seen)
+                if slot < count:
+                    reservoir[slot] = question
+        return reservoir
+    
     def create_default_questions(self):
         """Tworzy domyślny plik z pytaniami"""
         default_questions = [
@@ -88,7 +193,13 @@ class GameLogic:
             ("Jaka jest stolica Australii?", "canberra")
         ]
         
+        if not isinstance(self.questions_file, str) or os.path.isdir(self.questions_file):
+            # Bank z wielu paczek - nie nadpisujemy plików użytkownika
+            self.questions = default_questions
+            return
+        
         try:
+            import openpyxl  # Tylko tutaj - gra z cache nie ładuje openpyxl wcale
             workbook = openpyxl.Workbook()
             sheet = workbook.active
             sheet.title = "Pytania"
@@ -110,157 +221,499 @@ class GameLogic:
             logger.error(f"Błąd tworzenia domyślnych pytań: {e}")
             self.questions = default_questions[:10]  # Fallback
     
-    def start_new_game(self):
-        """Rozpoczyna nową grę"""
+    def start_new_game(self, category: Optional[str] = None, difficulty: Optional[Any] = None,
+                       language: Optional[str] = None):
+        """Rozpoczyna nową grę (filtry działają tylko z bazą SQLite)"""
+        if self.question_store is not None:
+            filters = {
+                'category': category,
+                'difficulty': difficulty,
+                'language': language
+            }
+            try:
+                questions = self.question_store.sample(self.question_count, **filters)
+                if questions:
+                    self.question_filters = filters
+                    self.questions = questions
+                else:
+                    # Gra bez pytań skończyłaby się od razu - zostają pytania poprzedniej gry
+                    logger.warning(f"Brak pytań dla filtrów {filters} - zostają poprzednie pytania")
+            except Exception as e:
+                logger.error(f"Błąd losowania pytań z bazy: {e}")
+        if self.journal is not None:
+            self.journal.begin_game(self._encode_game_questions())
+        self._begin_game()
+    
+    def _begin_game(self):
+        """Zeruje stan gry i przechodzi do odpowiadania"""
         self.current_question_index = 0
-        self.player_scores = {}
-        self.current_answers = {}
-        self.current_votes = {}
+        self.scores.reset()
+        self.leaderboard.clear()
+        self._clear_round()
         self.game_phase = "answering"
         logger.info("Rozpoczęto nową grę")
     
     def get_current_question(self) -> Optional[str]:
         """Zwraca aktualne pytanie"""
-        if self.current_question_index < len(self.questions):
-            question, answer = self.questions[self.current_question_index]
+        if self.current_question_index < len(self.question_order):
+            index = self.question_order[self.current_question_index]
+            question, answer, _ = self.question_pool[index]
+            self.answer_matcher = self.question_pool.get_matcher(index)
+            if self.question_rotation is not None:
+                self.question_rotation.mark_seen(self.question_pool.get_hashes()[index])
             self.correct_answer = answer
             return question
         return None
     
+    def _clear_round(self):
+        """Czyści odpowiedzi, głosy i grupy odpowiedzi bieżącej rundy"""
+        self.round.clear()
+        self._grouped_view = None
+        self._changed_groups = {}
+        self.votes_outstanding = 0
+    
+    def _player_id(self, player_name: str) -> int:
+        """Zwraca numer gracza, poszerzając kolumny rundy dla nowych graczy"""
+        player_id = self.players.intern(player_name)
+        if player_id >= len(self.round.answer_of):
+            self.round.grow(len(self.players))
+        return player_id
+    
     def add_player_answer(self, player_name: str, answer: str):
-        """Dodaje odpowiedź gracza"""
+        """Dodaje odpowiedź gracza i aktualizuje grupy odpowiedzi"""
         if self.game_phase == "answering":
-            self.current_answers[player_name] = answer.strip().lower()
+            answer = answer.strip().lower()
+            player_id = self._player_id(player_name)
+            state = self.round
+            text_id = state.text_id(answer)
+            previous = state.answer_of[player_id]
+            if previous == text_id:
+                return
+            if previous == NO_ANSWER:
+                state.answered.append(player_id)
+            else:
+                # Gracz zmienił odpowiedź - usuń go ze starej grupy
+                old_group = state.groups[previous]
+                del old_group.players[player_id]
+                if not old_group.players:
+                    state.groups[previous] = None
+                self._changed_groups[previous] = None
+            
+            state.answer_of[player_id] = text_id
+            group = state.groups[text_id]
+            if group is None:
+                group = state.groups[text_id] = AnswerGroup(answer, self.is_answer_correct(answer))
+            group.players[player_id] = None
+            self._changed_groups[text_id] = None
+            self._grouped_view = None
+            self._journal(game_journal.REC_ANSWER, player_name, answer)
             logger.info(f"Gracz {player_name} odpowiedział: {answer}")
     
     def are_all_answers_submitted(self, players_list: List[str]) -> bool:
-        """Sprawdza czy wszyscy gracze udzielili odpowiedzi"""
-        return len(self.current_answers) >= len(players_list)
+        """Sprawdza czy wszyscy obecni gracze udzielili odpowiedzi (O(1), gdy nikt nie jest rozłączony)"""
+        away = self.away_players
+        if not away:
+            return len(self.round.answered) >= len(players_list)
+        expected = sum(1 for player in players_list if self.players.get(player) not in away)
+        answered = sum(1 for player_id in self.round.answered if player_id not in away)
+        return answered >= expected
+    
+    def _format_group(self, group: AnswerGroup) -> Dict[str, Any]:
+        """Buduje opis jednej grupy odpowiedzi dla ekranu głosowania"""
+        names = self.players.names
+        players = [names[player_id] for player_id in group.players]
+        return {
+            'answer': group.text,
+            'players': players[0] if len(players) == 1 else ", ".join(players),
+            'is_correct': group.is_correct
+        }
     
     def get_grouped_answers(self) -> List[Dict[str, Any]]:
-        """Grupuje identyczne odpowiedzi"""
-        answer_groups = {}
-        
-        for player, answer in self.current_answers.items():
-            if answer in answer_groups:
-                answer_groups[answer]['players'].append(player)
-            else:
-                answer_groups[answer] = {
-                    'answer': answer,
-                    'players': [player],
-                    'is_correct': self.is_answer_correct(answer)
-                }
-        
-        # Konwertuj na listę i posortuj (poprawne odpowiedzi na górze)
-        grouped = list(answer_groups.values())
-        grouped.sort(key=lambda x: (not x['is_correct'], x['answer']))
-        
-        # Sformatuj nazwy graczy
-        for group in grouped:
-            if len(group['players']) == 1:
-                group['players'] = group['players'][0]
+        """Zwraca pogrupowane odpowiedzi (widok budowany ponownie tylko po zmianie)"""
+        if self._grouped_view is None:
+            grouped = [self._format_group(group) for group in self.round.groups if group is not None]
+            # Poprawne odpowiedzi na górze
+            grouped.sort(key=lambda x: (not x['is_correct'], x['answer']))
+            self._grouped_view = grouped
+        return [dict(group) for group in self._grouped_view]
+    
+    def pop_grouping_changes(self) -> List[Dict[str, Any]]:
+        """Zwraca grupy zmienione od ostatniego wywołania (do strumienia różnic stanu)"""
+        changes = []
+        for text_id in self._changed_groups:
+            group = self.round.groups[text_id]
+            if group is not None:
+                changes.append(self._format_group(group))
             else:
-                group['players'] = ", ".join(group['players'])
-        
-        return grouped
+                changes.append({'answer': self.round.texts[text_id], 'removed': True})
+        self._changed_groups = {}
+        return changes
     
     def is_answer_correct(self, answer: str) -> bool:
-        """Sprawdza czy odpowiedź jest poprawna"""
-        return answer.lower().strip() == self.correct_answer.lower().strip()
+        """Sprawdza czy odpowiedź jest poprawna (bez polskich znaków, z aliasami i literówkami)"""
+        matcher = self.answer_matcher
+        if matcher is None or matcher.answer != self.correct_answer:
+            matcher = self.answer_matcher = AnswerMatcher(self.correct_answer)
+        return matcher.matches(answer)
     
     def get_players_who_answered_correctly(self) -> List[str]:
         """Zwraca listę graczy, którzy odpowiedzieli poprawnie"""
+        names = self.players.names
         correct_players = []
-        for player, answer in self.current_answers.items():
-            if self.is_answer_correct(answer):
-                correct_players.append(player)
+        for group in self.round.groups:
+            if group is not None and group.is_correct:
+                correct_players.extend(names[player_id] for player_id in group.players)
         return correct_players
     
+    def _can_vote(self, player_id: Optional[int]) -> bool:
+        state = self.round
+        if player_id is None or player_id >= len(state.answer_of):
+            return False
+        if state.eligible_ready:
+            return bool(state.eligible[player_id])
+        text_id = state.answer_of[player_id]
+        return text_id != NO_ANSWER and not state.groups[text_id].is_correct
+    
     def can_player_vote(self, player_name: str) -> bool:
         """Sprawdza czy gracz może głosować (nie odpowiedział poprawnie)"""
-        if player_name not in self.current_answers:
-            return False
-        return not self.is_answer_correct(self.current_answers[player_name])
+        return self._can_vote(self.players.get(player_name))
+    
+    def _compute_eligible_voters(self, players_list: List[str]):
+        """Wyznacza uprawnionych do głosowania raz na rundę"""
+        state = self.round
+        outstanding = 0
+        for player in players_list:
+            player_id = self.players.get(player)
+            if self._can_vote(player_id):
+                state.eligible[player_id] = 1
+                if state.vote_of[player_id] == NO_ANSWER and player_id not in self.away_players:
+                    outstanding += 1
+        state.eligible_ready = True
+        self.votes_outstanding = outstanding
+    
+    def start_voting(self, players_list: List[str]):
+        """Zamyka fazę odpowiedzi i przechodzi do głosowania"""
+        self._compute_eligible_voters(players_list)
+        self.game_phase = "voting"
+        self._journal(game_journal.REC_VOTING, *players_list)
+        logger.info(f"Rozpoczęto głosowanie, oczekiwane głosy: {self.votes_outstanding}")
     
     def add_vote(self, player_name: str, voted_answer: str):
         """Dodaje głos gracza"""
-        if self.game_phase == "voting" and self.can_player_vote(player_name):
-            self.current_votes[player_name] = voted_answer.strip().lower()
+        if self.game_phase != "voting":
+            return
+        player_id = self.players.get(player_name)
+        if self._can_vote(player_id):
+            state = self.round
+            if state.vote_of[player_id] == NO_ANSWER:
+                state.voted.append(player_id)
+                if state.eligible_ready and player_id not in self.away_players:
+                    self.votes_outstanding -= 1
+            state.vote_of[player_id] = state.text_id(voted_answer.strip().lower())
+            self._journal(game_journal.REC_VOTE, player_name, voted_answer)
             logger.info(f"Gracz {player_name} zagłosował na: {voted_answer}")
     
     def are_all_votes_submitted(self, players_list: List[str]) -> bool:
-        """Sprawdza czy wszyscy uprawnieni gracze zagłosowali"""
-        eligible_voters = [p for p in players_list if self.can_player_vote(p)]
-        return len(self.current_votes) >= len(eligible_voters)
+        """Sprawdza czy wszyscy uprawnieni gracze zagłosowali (O(1) po zamknięciu odpowiedzi)"""
+        if not self.round.eligible_ready:
+            self._compute_eligible_voters(players_list)
+        return self.votes_outstanding <= 0
+    
+    def remove_player(self, player_name: str):
+        """Uwzględnia rozłączenie gracza w trakcie rundy"""
+        player_id = self.players.get(player_name)
+        state = self.round
+        away = player_id in self.away_players  # Już nie liczony w oczekiwanych głosach
+        self.away_players.discard(player_id)
+        if state.eligible_ready and player_id is not None and state.eligible[player_id]:
+            state.eligible[player_id] = 0
+            if state.vote_of[player_id] == NO_ANSWER and not away:
+                self.votes_outstanding -= 1
+            self._journal(game_journal.REC_REMOVE, player_name)
+    
+    def set_player_away(self, player_name: str, away: bool = True):
+        """Rozłączony gracz nie wstrzymuje rundy do końca czasu na powrót; po powrocie znów się liczy"""
+        player_id = self._player_id(player_name)
+        if (player_id in self.away_players) == away:
+            return
+        if away:
+            self.away_players.add(player_id)
+        else:
+            self.away_players.discard(player_id)
+        state = self.round
+        if state.eligible_ready and state.eligible[player_id] and state.vote_of[player_id] == NO_ANSWER:
+            self.votes_outstanding += -1 if away else 1
     
     def calculate_round_scores(self, players_list: List[str]) -> Dict[str, int]:
-        """Oblicza punkty za rundę"""
-        round_scores = {player: 0 for player in players_list}
+        """Oblicza punkty za rundę w czasie O(gracze + głosy)"""
+        names = self.players.names
+        state = self.round
+        round_points: Dict[int, int] = {}
+        self._journal(game_journal.REC_SCORE, *players_list)
         
         # Inicjalizuj wyniki graczy jeśli to pierwsza runda
         for player in players_list:
-            if player not in self.player_scores:
-                self.player_scores[player] = 0
+            player_id = self._player_id(player)
+            self.scores.ensure(player_id)
+            round_points[player_id] = 0
+        
+        def award(player_id: int, points: int):
+            round_points[player_id] = round_points.get(player_id, 0) + points
+            self.scores.add(player_id, points)
         
         # 3 punkty za poprawną odpowiedź od razu
-        correct_players = self.get_players_who_answered_correctly()
-        for player in correct_players:
-            round_scores[player] += 3
-            self.player_scores[player] += 3
-            logger.info(f"Gracz {player} dostaje 3 pkt za poprawną odpowiedź")
+        for player_id in state.answered:
+            if state.groups[state.answer_of[player_id]].is_correct:
+                award(player_id, 3)
+                logger.info(f"Gracz {names[player_id]} dostaje 3 pkt za poprawną odpowiedź")
         
         # 2 punkty za zagłosowanie na poprawną odpowiedź (tylko dla tych co nie odpowiedzieli poprawnie)
-        for voter, voted_answer in self.current_votes.items():
-            if self.is_answer_correct(voted_answer) and voter not in correct_players:
-                round_scores[voter] += 2
-                self.player_scores[voter] += 2
-                logger.info(f"Gracz {voter} dostaje 2 pkt za głos na poprawną odpowiedź")
+        wrong_answer_votes: Dict[int, int] = {}
+        for voter_id in state.voted:
+            text_id = state.vote_of[voter_id]
+            group = state.groups[text_id]
+            if group is None:
+                # Głos na tekst, którego nikt nie podał - liczy się tylko poprawność
+                if self.is_answer_correct(state.texts[text_id]):
+                    award(voter_id, 2)
+                    logger.info(f"Gracz {names[voter_id]} dostaje 2 pkt za głos na poprawną odpowiedź")
+                continue
+            if group.is_correct:
+                own_answer = state.answer_of[voter_id]
+                if own_answer == NO_ANSWER or not state.groups[own_answer].is_correct:
+                    award(voter_id, 2)
+                    logger.info(f"Gracz {names[voter_id]} dostaje 2 pkt za głos na poprawną odpowiedź")
+            else:
+                wrong_answer_votes[text_id] = wrong_answer_votes.get(text_id, 0) + 1
         
         # 1 punkt za każdy głos na swoją błędną odpowiedź
-        for voter, voted_answer in self.current_votes.items():
-            for player, player_answer in self.current_answers.items():
-                if (player_answer == voted_answer and 
-                    not self.is_answer_correct(player_answer)):
-                    round_scores[player] += 1
-                    self.player_scores[player] += 1
-                    logger.info(f"Gracz {player} dostaje 1 pkt za głos na swoją błędną odpowiedź")
+        for text_id, votes in wrong_answer_votes.items():
+            for player_id in state.groups[text_id].players:
+                award(player_id, votes)
+                logger.info(f"Gracz {names[player_id]} dostaje {votes} pkt za głosy na swoją błędną odpowiedź")
         
-        return round_scores
+        # Przesuń w rankingu tylko graczy z tej rundy
+        for player_id in round_points:
+            self.leaderboard.update(player_id, self.scores.scores[player_id])
+        
+        self.game_phase = "results"
+        return {names[player_id]: points for player_id, points in round_points.items()}
     
     def next_question(self):
         """Przechodzi do następnego pytania"""
         self.current_question_index += 1
-        self.current_answers = {}
-        self.current_votes = {}
+        self._clear_round()
         self.game_phase = "answering"
+        self._journal(game_journal.REC_NEXT)
+        
+        if self.is_game_finished() and self.question_rotation is not None:
+            self.question_rotation.save()
     
     def is_game_finished(self) -> bool:
         """Sprawdza czy gra się skończyła"""
-        return self.current_question_index >= len(self.questions)
+        return self.current_question_index >= len(self.question_order)
     
     def get_final_scores(self) -> Dict[str, int]:
-        """Zwraca końcowe wyniki"""
-        return self.player_scores.copy()
+        """Zwraca końcowe wyniki (od najlepszego)"""
+        return self.get_current_scores()
     
     def get_current_scores(self) -> Dict[str, int]:
-        """Zwraca aktualne wyniki"""
-        return self.player_scores.copy()
+        """Zwraca aktualne wyniki (od najlepszego, bez ponownego sortowania)"""
+        names = self.players.names
+        return {names[player_id]: score for player_id, score, _ in self.leaderboard.ordered()}
+    
+    def _ranking_entries(self, entries: List[Tuple[int, int, int]]) -> List[Dict[str, Any]]:
+        names = self.players.names
+        return [
+            {'player': names[player_id], 'score': score, 'rank': rank}
+            for player_id, score, rank in entries
+        ]
+    
+    def get_top_scores(self, k: int = 5) -> List[Dict[str, Any]]:
+        """Zwraca k najlepszych graczy z miejscami"""
+        return self._ranking_entries(self.leaderboard.top(k))
+    
+    def get_player_rank(self, player_name: str) -> Optional[int]:
+        """Zwraca miejsce gracza w rankingu (None, jeśli jeszcze nie ma wyniku)"""
+        player_id = self.players.get(player_name)
+        if player_id is None or player_id not in self.leaderboard:
+            return None
+        return self.leaderboard.rank(player_id)
+    
+    def get_players_near(self, player_name: str, radius: int = 2) -> List[Dict[str, Any]]:
+        """Zwraca graczy sąsiadujących w rankingu z danym graczem"""
+        player_id = self.players.get(player_name)
+        if player_id is None or player_id not in self.leaderboard:
+            return []
+        return self._ranking_entries(self.leaderboard.around(player_id, radius))
+    
+    def get_scoreboard_for(self, player_name: str, top_k: int = 3, radius: int = 1) -> Dict[str, Any]:
+        """Zwraca fragment rankingu potrzebny jednemu graczowi (czołówka + sąsiedzi)"""
+        return {
+            'top': self.get_top_scores(top_k),
+            'rank': self.get_player_rank(player_name),
+            'near': self.get_players_near(player_name, radius),
+            'total_players': len(self.leaderboard)
+        }
     
     def reset_game(self):
         """Resetuje grę"""
+        self._reset_state()
+        
+        if self.question_rotation is not None:
+            # Zapisz zadane pytania i wylosuj nowe spośród niezadanych
+            self.question_rotation.save()
+            self.question_order = self._draw_question_order()
+        else:
+            # Wymieszaj kolejność pytań ponownie (pula pozostaje nietknięta)
+            random.shuffle(self.question_order)
+        # Nowa kolejność trafia do dziennika - odtworzenie nie może jej wylosować ponownie
+        if self.journal is not None:
+            self.journal.append(game_journal.REC_RESET, self._encode_game_questions())
+    
+    def _reset_state(self):
+        """Zeruje wyniki i rundę, gra czeka na start"""
         self.current_question_index = 0
-        self.player_scores = {}
-        self.current_answers = {}
-        self.current_votes = {}
+        self.scores.reset()
+        self.leaderboard.clear()
+        self._clear_round()
         self.game_phase = "waiting"
-        
-        # Wymieszaj pytania ponownie
-        random.shuffle(self.questions)
+    
+    def update_link_stats(self, report: Mapping[str, Mapping[str, Any]]):
+        """Zapamiętuje czasy odpowiedzi łączy graczy (z NetworkManager.get_link_report)"""
+        self.link_rtts = {name: stats['rtt'] for name, stats in report.items() if stats.get('rtt') is not None}
+    
+    def latency_allowance(self, players_list: List[str], limit: float = MAX_LATENCY_ALLOWANCE) -> float:
+        """O ile wydłużyć termin, by pytanie i odpowiedź zdążyły przejść przez najwolniejsze łącze"""
+        slowest = max((self.link_rtts.get(name, 0.0) for name in players_list), default=0.0)
+        return min(slowest, limit)
     
     def get_game_progress(self) -> Tuple[int, int]:
         """Zwraca postęp gry (aktualne pytanie, łączna liczba pytań)"""
-        return (self.current_question_index + 1, len(self.questions))
+        return (self.current_question_index + 1, len(self.question_order))
     
     def get_correct_answer(self) -> str:
         """Zwraca poprawną odpowiedź na aktualne pytanie"""
-        return self.correct_answer
\ No newline at end of file
+        return self.correct_answer
+    
+    def _journal(self, record_type: int, *values: str):
+        """Dopisuje zmianę stanu do dziennika (tylko bufor w pamięci)"""
+        if self.journal is not None:
+            self.journal.append(record_type, game_journal.pack_strings(values) if values else b"")
+    
+    def _encode_game_questions(self) -> bytes:
+        """Koduje pytania bieżącej gry do rekordu startu"""
+        values = []
+        for index in self.question_order:
+            question, answer, aliases = self.question_pool[index]
+            values.extend((question, answer, "|".join(aliases)))
+        return game_journal.pack_strings(values)
+    
+    @staticmethod
+    def _decode_game_questions(values: List[str]) -> List[Question]:
+        """Odwrotność _encode_game_questions (po unpack_strings)"""
+        return [(values[i], values[i + 1], tuple(filter(None, values[i + 2].split("|"))))
+                for i in range(0, len(values), 3)]
+    
+    def attach_journal(self, path: str) -> GameJournal:
+        """Włącza zapisywanie zmian stanu do dziennika"""
+        if self.journal is not None:
+            self.journal.close()
+        self.journal = GameJournal(path)
+        return self.journal
+    
+    def replay_journal(self, path: str) -> int:
+        """Odtwarza stan gry z dziennika; zwraca liczbę zastosowanych rekordów"""
+        journal, self.journal = self.journal, None  # Nie zapisuj ponownie odtwarzanych zmian
+        applied = 0
+        try:
+            for record_type, payload in game_journal.read_journal(path):
+                values = game_journal.unpack_strings(payload) if payload else []
+                if record_type == game_journal.REC_START:
+                    self.questions = self._decode_game_questions(values)
+                    self._begin_game()
+                    self.get_current_question()
+                elif record_type == game_journal.REC_ANSWER:
+                    self.add_player_answer(values[0], values[1])
+                elif record_type == game_journal.REC_VOTING:
+                    self.start_voting(values)
+                elif record_type == game_journal.REC_VOTE:
+                    self.add_vote(values[0], values[1])
+                elif record_type == game_journal.REC_SCORE:
+                    self.calculate_round_scores(values)
+                elif record_type == game_journal.REC_NEXT:
+                    self.next_question()
+                    self.get_current_question()
+                elif record_type == game_journal.REC_RESET:
+                    if values:
+                        self.questions = self._decode_game_questions(values)
+                        self._reset_state()
+                    else:
+                        self.reset_game()  # Dziennik sprzed zapisu kolejności pytań
+                elif record_type == game_journal.REC_REMOVE:
+                    self.remove_player(values[0])
+                applied += 1
+        except FileNotFoundError:
+            logger.info(f"Brak dziennika gry: {path}")
+        finally:
+            self.journal = journal
+        logger.info(f"Odtworzono {applied} rekordów z dziennika {path}")
+        return applied
+    
+    def create_snapshot(self) -> bytes:
+        """Tworzy zwarty, wersjonowany zrzut pełnego stanu gry (np. dla zapasowego hosta)"""
+        names = self.players.names
+        state = self.round
+        data = {
+            'questions': [list(self.question_pool[index][:2]) + [list(self.question_pool[index][2])]
+                          for index in self.question_order],
+            'index': self.current_question_index,
+            'phase': self.game_phase,
+            'scores': [[names[player_id], score] for player_id, score, _ in self.leaderboard.ordered()],
+            'answers': [[names[player_id], state.texts[state.answer_of[player_id]]]
+                        for player_id in state.answered],
+            'votes': [[names[player_id], state.texts[state.vote_of[player_id]]]
+                      for player_id in state.voted],
+            'eligible': ([names[player_id] for player_id in state.answered if state.eligible[player_id]]
+                         if state.eligible_ready else None),
+        }
+        payload = zlib.compress(json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+        return _SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION) + payload
+    
+    def restore_snapshot(self, snapshot: bytes):
+        """Wczytuje zrzut stanu utworzony przez create_snapshot"""
+        magic, version = _SNAPSHOT_HEADER.unpack_from(snapshot)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError(f"Nieobsługiwany zrzut gry (wersja {version})")
+        data = json.loads(zlib.decompress(snapshot[_SNAPSHOT_HEADER.size:]).decode('utf-8'))
+        
+        journal, self.journal = self.journal, None
+        try:
+            self.questions = [(question, answer, tuple(aliases))
+                              for question, answer, aliases in data['questions']]
+            self._begin_game()
+            self.current_question_index = data['index']
+            self.get_current_question()
+            
+            for name, score in data['scores']:
+                player_id = self._player_id(name)
+                self.scores.add(player_id, score)
+                self.leaderboard.update(player_id, score)
+            
+            self.game_phase = "answering"
+            for name, answer in data['answers']:
+                self.add_player_answer(name, answer)
+            
+            state = self.round
+            if data['eligible'] is not None:
+                for name in data['eligible']:
+                    state.eligible[self._player_id(name)] = 1
+                state.eligible_ready = True
+                self.votes_outstanding = len(data['eligible'])
+            self.game_phase = "voting"
+            for name, vote in data['votes']:
+                self.add_vote(name, vote)
+            self.game_phase = data['phase']
+        finally:
+            self.journal = journal
+        logger.info(f"Odtworzono grę ze zrzutu ({len(snapshot)} B)")
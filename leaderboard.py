@@ -0,0 +1,76 @@
+"""
+Moduł rankingu - posortowana tabela wyników aktualizowana przyrostowo,
+odpowiadająca na zapytania o czołówkę i miejsce gracza bez sortowania wszystkich
+"""
+
+from bisect import bisect_left, insort
+from typing import Dict, List, Tuple
+
+
+class Leaderboard:
+    """Ranking graczy (numerów) według malejącego wyniku"""
+
+    __slots__ = ("_keys", "_scores")
+
+    def __init__(self):
+        self._keys: List[Tuple[int, int]] = []  # (-wynik, numer gracza), rosnąco
+        self._scores: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, player_id: int) -> bool:
+        return player_id in self._scores
+
+    def update(self, player_id: int, score: int):
+        """Ustawia wynik gracza, przesuwając go w rankingu"""
+        old_score = self._scores.get(player_id)
+        if old_score == score:
+            return
+        if old_score is not None:
+            del self._keys[bisect_left(self._keys, (-old_score, player_id))]
+        self._scores[player_id] = score
+        insort(self._keys, (-score, player_id))
+
+    def remove(self, player_id: int):
+        """Usuwa gracza z rankingu"""
+        old_score = self._scores.pop(player_id, None)
+        if old_score is not None:
+            del self._keys[bisect_left(self._keys, (-old_score, player_id))]
+
+    def clear(self):
+        self._keys.clear()
+        self._scores.clear()
+
+    def score(self, player_id: int) -> int:
+        return self._scores[player_id]
+
+    def rank(self, player_id: int) -> int:
+        """Miejsce gracza (1 = pierwsze); remisy dzielą miejsce"""
+        return bisect_left(self._keys, (-self._scores[player_id], -1)) + 1
+
+    def _entries(self, start: int, stop: int) -> List[Tuple[int, int, int]]:
+        """Zwraca (numer gracza, wynik, miejsce) dla pozycji [start, stop)"""
+        entries = []
+        rank = None
+        previous_score = None
+        for position in range(max(start, 0), min(stop, len(self._keys))):
+            negative_score, player_id = self._keys[position]
+            if negative_score != previous_score:
+                rank = bisect_left(self._keys, (negative_score, -1)) + 1
+                previous_score = negative_score
+            entries.append((player_id, -negative_score, rank))
+        return entries
+
+    def top(self, k: int) -> List[Tuple[int, int, int]]:
+        """Zwraca k najlepszych graczy jako (numer, wynik, miejsce)"""
+        return self._entries(0, k)
+
+    def around(self, player_id: int, radius: int = 2) -> List[Tuple[int, int, int]]:
+        """Zwraca graczy sąsiadujących w rankingu z danym graczem"""
+        position = bisect_left(self._keys, (-self._scores[player_id], player_id))
+        return self._entries(position - radius, position + radius + 1)
+
+    def ordered(self) -> List[Tuple[int, int, int]]:
+        """Cały ranking od pierwszego miejsca"""
+        return self._entries(0, len(self._keys))
@@ -0,0 +1,90 @@
+"""
+Moduł statystyk łącza - czasy odpowiedzi (RTT) na pingi hosta w histogramie
+oraz szacowana różnica zegara klienta względem hosta, osobno dla każdego gracza
+"""
+
+from array import array
+from bisect import bisect_left
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+# Górne granice przedziałów histogramu RTT (s); ostatni przedział to wszystko powyżej
+RTT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.2, 0.5, 1.0)
+RTT_SMOOTHING = 0.125  # Waga nowej próbki w średniej kroczącej (jak SRTT w TCP)
+OFFSET_WINDOW = 8  # Różnicę zegarów bierzemy z próbki o najmniejszym RTT spośród ostatnich
+
+
+class LinkStats:
+    """Jakość łącza jednego gracza widziana przez hosta"""
+
+    __slots__ = ("player_name", "histogram", "samples", "pings_sent", "rtt", "smoothed_rtt",
+                 "min_rtt", "max_rtt", "last_sample_time", "_offsets")
+
+    def __init__(self, player_name: str):
+        self.player_name = player_name
+        self.histogram = array('I', [0]) * (len(RTT_BUCKETS) + 1)  # Liczba próbek w przedziałach
+        self.samples = 0
+        self.pings_sent = 0
+        self.rtt: Optional[float] = None  # Ostatni pomiar (s)
+        self.smoothed_rtt: Optional[float] = None
+        self.min_rtt: Optional[float] = None
+        self.max_rtt: Optional[float] = None
+        self.last_sample_time: Optional[float] = None  # time.monotonic() hosta przy ostatniej odpowiedzi
+        self._offsets: Deque[Tuple[float, float]] = deque(maxlen=OFFSET_WINDOW)  # (rtt, różnica zegarów)
+
+    def add_sample(self, rtt: float, clock_offset: float, now: float):
+        """Dodaje pomiar: czas odpowiedzi na ping i różnicę zegarów z tej odpowiedzi"""
+        self.histogram[bisect_left(RTT_BUCKETS, rtt)] += 1
+        self.samples += 1
+        self.rtt = rtt
+        if self.smoothed_rtt is None:
+            self.smoothed_rtt = rtt
+        else:
+            self.smoothed_rtt += RTT_SMOOTHING * (rtt - self.smoothed_rtt)
+        self.min_rtt = rtt if self.min_rtt is None else min(self.min_rtt, rtt)
+        self.max_rtt = rtt if self.max_rtt is None else max(self.max_rtt, rtt)
+        self.last_sample_time = now
+        self._offsets.append((rtt, clock_offset))
+
+    @property
+    def clock_offset(self) -> Optional[float]:
+        """O ile zegar klienta spieszy się względem hosta (s); najdokładniejsza jest próbka z najkrótszym RTT"""
+        if not self._offsets:
+            return None
+        return min(self._offsets)[1]
+
+    @property
+    def lost(self) -> int:
+        """Pingi bez odpowiedzi (ostatni może być jeszcze w drodze)"""
+        return max(0, self.pings_sent - self.samples - 1)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Górna granica przedziału histogramu, w którym leży dany percentyl RTT"""
+        if not self.samples:
+            return None
+        needed = fraction * self.samples
+        count = 0
+        for index, bucket_count in enumerate(self.histogram):
+            count += bucket_count
+            if count >= needed and bucket_count:
+                return RTT_BUCKETS[index] if index < len(RTT_BUCKETS) else self.max_rtt
+        return self.max_rtt
+
+    def is_laggy(self, threshold: float, now: float, max_silence: float) -> bool:
+        """Łącze wolniejsze niż próg albo gracz od dawna nie odpowiada na pingi"""
+        if self.last_sample_time is None:
+            return False  # Brak pomiarów (np. starszy klient bez odpowiedzi na ping)
+        return self.smoothed_rtt > threshold or now - self.last_sample_time > max_silence
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Podsumowanie dla interfejsu hosta i GameLogic"""
+        return {
+            'rtt': self.smoothed_rtt,
+            'last_rtt': self.rtt,
+            'min_rtt': self.min_rtt,
+            'p95_rtt': self.percentile(0.95),
+            'clock_offset': self.clock_offset,
+            'samples': self.samples,
+            'lost': self.lost,
+            'histogram': list(self.histogram)
+        }
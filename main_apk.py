@@ -19,8 +19,6 @@ from kivy.graphics import Color, RoundedRectangle
 from kivy.metrics import dp
 from kivy.core.window import Window
 
-import asyncio
-import threading
 import socket
 import json
 import os
@@ -43,12 +41,16 @@ Window.size = (400, 700)
 
 try:
     from game_logic import GameLogic
-    from network_manager import NetworkManager
+    from network_manager import MSG_LINK_STATS, NetworkManager
     HAS_NETWORK = True
 except ImportError:
     HAS_NETWORK = False
     print("⚠️ Brak modułów sieciowych - tryb offline")
 
+def schedule_on_ui(callback):
+    """Uruchamia funkcję w wątku Kivy przy najbliższej klatce (bezpieczne z innych wątków)"""
+    Clock.schedule_once(lambda dt: callback())
+
 class StyledButton(Button):
     """Przycisk z ładnym stylem"""
     def __init__(self, button_type='primary', **kwargs):
@@ -348,16 +350,15 @@ class HostSetupScreen(Screen):
         
         # Inicjalizuj komponenty gry
         app.network_manager = NetworkManager(is_host=True)
-        app.game_logic = GameLogic()
+        app.network_manager.set_scheduler(schedule_on_ui)
+        # Host losuje pytania - rotacja zapamiętuje zadane między sesjami
+        app.game_logic = GameLogic(rotate_questions=True)
+        # Raport łączy graczy (co kilka sekund) - do wydłużania terminów odpowiedzi
+        app.network_manager.on_message(
+            MSG_LINK_STATS, lambda message: app.game_logic.update_link_stats(message['players']))
         
-        # Uruchom serwer w osobnym wątku
-        def start_server():
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(app.network_manager.start_server())
-        
-        server_thread = threading.Thread(target=start_server, daemon=True)
-        server_thread.start()
+        # Uruchom serwer w wątku sieci NetworkManager
+        app.network_manager.submit(app.network_manager.start_server(app.player_name))
         
         # Przejdź do lobby
         self.manager.current = 'lobby'
@@ -454,26 +455,23 @@ class JoinSetupScreen(Screen):
         
         # Inicjalizuj komponenty
         app.network_manager = NetworkManager(is_host=False, host_ip=host_ip)
+        app.network_manager.set_scheduler(schedule_on_ui)
         app.game_logic = GameLogic()
         
         self.status_label.text = "🔄 Łączenie..."
         self.status_label.color = COLORS['warning']
         
-        # Połącz w osobnym wątku
-        def connect():
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            success = loop.run_until_complete(
-                app.network_manager.connect_to_host(player_name)
-            )
+        # Połącz w wątku sieci NetworkManager
+        def connected(future):
+            success = not future.cancelled() and future.exception() is None and future.result()
             
             if success:
                 Clock.schedule_once(lambda dt: setattr(self.manager, 'current', 'lobby'))
             else:
                 Clock.schedule_once(lambda dt: self.connection_failed())
         
-        connect_thread = threading.Thread(target=connect, daemon=True)
-        connect_thread.start()
+        future = app.network_manager.submit(app.network_manager.connect_to_host(player_name))
+        future.add_done_callback(connected)
     
     def connection_failed(self):
         """Obsługuje nieudane połączenie"""
@@ -802,6 +800,11 @@ class QuizPartyApp(App):
         sm.add_widget(QuestionsScreen())
         
         return sm
+    
+    def on_stop(self):
+        """Zamyka połączenia i wątek sieci przy wyjściu z aplikacji"""
+        if self.network_manager:
+            self.network_manager.shutdown()
 
 if __name__ == '__main__':
     QuizPartyApp().run()
\ No newline at end of file
@@ -0,0 +1,127 @@
+"""
+Moduł ramek wiadomości - wiadomość rozsyłana do wielu klientów jest kodowana
+tylko raz (dla każdego użytego kodowania), a gotowe bajty są współdzielone
+przez wszystkie kolejki wysyłki
+"""
+
+import json
+import zlib
+from typing import Any, Dict, Iterable, Optional, Union
+
+from binary_codec import decode_binary, encode_binary, is_binary
+
+try:
+    from websockets.version import version as _websockets_version
+    # send(bytes, text=True) - gotowy UTF-8 jako ramka tekstowa - jest dopiero od websockets 14
+    SEND_BYTES_AS_TEXT = int(_websockets_version.split(".")[0]) >= 14
+except (ImportError, ValueError):
+    SEND_BYTES_AS_TEXT = False
+
+COMPRESS_MIN_SIZE = 512  # Krótszych wiadomości nie opłaca się kompresować
+COMPRESS_LEVEL = 6
+
+# Kodowania wiadomości uzgadniane przy dołączaniu (w kolejności preferencji)
+ENCODING_BINARY = 'binary'
+ENCODING_JSON = 'json'
+SUPPORTED_ENCODINGS = (ENCODING_BINARY, ENCODING_JSON)
+
+
+def encode_json(message: Dict[str, Any]) -> bytes:
+    """Koduje wiadomość do zwartego JSON w UTF-8"""
+    return json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def decode_message(raw: Union[str, bytes]) -> Dict[str, Any]:
+    """Dekoduje wiadomość w dowolnym kodowaniu: JSON, binarnym lub skompresowanym zlib"""
+    if isinstance(raw, str):
+        return json.loads(raw)
+    if is_binary(raw):
+        return decode_binary(raw)
+    data = zlib.decompress(raw)
+    if is_binary(data):
+        return decode_binary(data)
+    return json.loads(data)
+
+
+def encode_message(message: Dict[str, Any], encoding: str = ENCODING_JSON) -> Union[str, bytes]:
+    """Koduje pojedynczą wiadomość w wybranym kodowaniu"""
+    if encoding == ENCODING_BINARY:
+        return encode_binary(message)
+    return json.dumps(message)
+
+
+def choose_encoding(offered: Iterable[str]) -> str:
+    """Wybiera pierwsze obsługiwane kodowanie z listy klienta (domyślnie JSON)"""
+    for encoding in offered or ():
+        if encoding in SUPPORTED_ENCODINGS:
+            return encoding
+    return ENCODING_JSON
+
+
+def _compress(data: bytes) -> Optional[bytes]:
+    if len(data) < COMPRESS_MIN_SIZE:
+        return None
+    return zlib.compress(data, COMPRESS_LEVEL)
+
+
+class Frame:
+    """Wiadomość zakodowana raz i wysyłana bez kopiowania do wielu klientów"""
+
+    __slots__ = ("message", "seq", "_data", "_text", "_compressed", "_binary", "_binary_compressed")
+
+    def __init__(self, message: Dict[str, Any], seq: int = 0):
+        self.message = message
+        self.seq = seq  # Numer w strumieniu hosta (0 = poza strumieniem, bez wznawiania)
+        self._data: Optional[bytes] = None
+        self._text: Optional[str] = None
+        self._compressed: Optional[bytes] = None
+        self._binary: Optional[bytes] = None
+        self._binary_compressed: Optional[bytes] = None
+
+    @property
+    def data(self) -> bytes:
+        """JSON w UTF-8 (wysyłany jako ramka tekstowa)"""
+        if self._data is None:
+            self._data = encode_json(self.message)
+        return self._data
+
+    @property
+    def text(self) -> str:
+        """JSON jako str - dla starszych websockets, które ramki tekstowe przyjmują tylko jako str"""
+        if self._text is None:
+            self._text = self.data.decode("utf-8")
+        return self._text
+
+    @property
+    def compressed(self) -> Optional[bytes]:
+        """JSON skompresowany zlib albo None, gdy wiadomość jest za krótka"""
+        if self._compressed is None:
+            self._compressed = _compress(self.data)
+        return self._compressed
+
+    @property
+    def binary(self) -> bytes:
+        """Postać binarna (binary_codec)"""
+        if self._binary is None:
+            self._binary = encode_binary(self.message)
+        return self._binary
+
+    @property
+    def binary_compressed(self) -> Optional[bytes]:
+        """Postać binarna skompresowana zlib albo None, gdy wiadomość jest za krótka"""
+        if self._binary_compressed is None:
+            self._binary_compressed = _compress(self.binary)
+        return self._binary_compressed
+
+    async def send(self, websocket, compress: bool = False, encoding: str = ENCODING_JSON):
+        """Wysyła ramkę; te same bajty trafiają do każdego odbiorcy"""
+        if encoding == ENCODING_BINARY:
+            await websocket.send((compress and self.binary_compressed) or self.binary)
+            return
+        compressed = self.compressed if compress else None
+        if compressed is not None:
+            await websocket.send(compressed)
+        elif SEND_BYTES_AS_TEXT:
+            await websocket.send(self.data, text=True)
+        else:
+            await websocket.send(self.text)
@@ -4,32 +4,99 @@ Używa WebSocket do komunikacji real-time
 """
 
 import asyncio
+import base64
 import websockets
 import json
 import threading
-from typing import Dict, List, Optional, Any
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Deque, Dict, List, Optional, Tuple, Any
 import logging
 
+from client_connection import ClientConnection, POLICY_DROP_OLDEST
+from link_stats import LinkStats
+from message_frame import (ENCODING_JSON, SUPPORTED_ENCODINGS, Frame, choose_encoding,
+                           decode_message, encode_message)
+from player_session import PlayerSession
+from state_sync import MSG_SYNC_REQUEST, StateReplica, StateSync
+
 # Konfiguracja logowania
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+MSG_BATCH = 'batch'  # Kilka rozgłoszeń z jednego okna łączenia w jednej ramce
+MSG_REDIRECT = 'redirect'  # Pokój obsługuje inny proces serwera - połącz się z jego portem
+# Wiadomości, z których w oknie łączenia liczy się tylko najnowsza
+REPLACEABLE_TYPES = frozenset({'answer_count', 'vote_count', 'progress'})
+ANY_MESSAGE = '*'  # Typ dla obsługi wszystkich wiadomości
+MSG_PING = 'ping'  # Host mierzy czas odpowiedzi klienta (poza strumieniem wznowień)
+MSG_PONG = 'pong'
+MSG_PLAYER_AWAY = 'player_away'  # Gracz rozłączony, czeka na wznowienie (lokalnie na hoście)
+MSG_PLAYER_BACK = 'player_back'  # Gracz wrócił z tokenem wznowienia (lokalnie na hoście)
+MSG_LINK_STATS = 'link_stats'  # Raport jakości łączy graczy (lokalnie na hoście, co heartbeat_interval)
+PING_HISTORY = 8  # Ostatnie pingi, na które host jeszcze przyjmuje odpowiedź
+
+MessageHandler = Callable[[Dict[str, Any]], None]
+Scheduler = Callable[[Callable[[], None]], None]  # Uruchamia funkcję w wątku interfejsu
+
 class NetworkManager:
     """Zarządza komunikacją sieciową między graczami"""
     
-    def __init__(self, is_host: bool = False, host_ip: str = None, port: int = 8765):
+    def __init__(self, is_host: bool = False, host_ip: str = None, port: int = 8765,
+                 send_queue_size: int = 256, slow_client_policy: str = POLICY_DROP_OLDEST,
+                 coalesce_interval: Optional[float] = None, room_code: Optional[str] = None,
+                 replay_buffer_size: int = 256, resume_grace: float = 60.0,
+                 heartbeat_interval: Optional[float] = 2.0, lag_threshold: float = 0.3):
         self.is_host = is_host
         self.host_ip = host_ip or "localhost"
         self.port = port
+        self.room_code = room_code  # Kod pokoju na serwerze wielu stołów (None = jedna gra)
         self.players: Dict[str, websockets.WebSocketServerProtocol] = {}  # nazwa -> websocket
+        self.connections: Dict[str, ClientConnection] = {}  # nazwa -> kolejka wysyłki klienta
+        self.send_queue_size = send_queue_size  # Maksymalna liczba wiadomości czekających na klienta
+        self.slow_client_policy = slow_client_policy  # Co zrobić, gdy klient nie nadąża
+        self.coalesce_interval = coalesce_interval  # Okno łączenia rozgłoszeń (s, np. 0.04); None = od razu
+        self._outbox: Dict[Any, Dict[str, Any]] = {}  # Rozgłoszenia czekające na koniec okna
+        self._outbox_serial = 0
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # Wznawianie sesji: rozłączony gracz zachowuje miejsce przez resume_grace sekund
+        self.sessions: Dict[str, PlayerSession] = {}  # nazwa -> token i bufor wiadomości (host)
+        self.replay_buffer_size = replay_buffer_size
+        self.resume_grace = resume_grace
+        self._seq = 0  # Numer ostatniej ramki w strumieniu hosta
+        self.resume_token: Optional[str] = None  # Token wznowienia (klient)
+        self.last_seq = 0  # Numer ostatniej odebranej ramki (klient)
+        self.resume_timeout = resume_grace  # Jak długo klient próbuje wrócić po zerwaniu
+        self._closing = False
+        # Pomiar łącza: ping co heartbeat_interval sekund (None = wyłączony)
+        self.link_stats: Dict[str, LinkStats] = {}  # nazwa -> RTT i różnica zegarów (host)
+        self.heartbeat_interval = heartbeat_interval
+        self.lag_threshold = lag_threshold  # RTT (s), powyżej którego gracz uchodzi za lagującego
+        self._ping_id = 0
+        self._ping_times: Deque[Tuple[int, float]] = deque(maxlen=PING_HISTORY)  # (numer pingu, czas wysłania)
+        self._heartbeat_task: Optional[asyncio.Task] = None
         self.player_name = ""
         self.client_websocket = None
+        self.encoding = ENCODING_JSON  # Kodowanie wiadomości do hosta (klient)
         self.server = None
-        self.pending_messages = []
-        self.message_lock = threading.Lock()
+        # Wiadomości przychodzące: wątek sieci dopisuje, wątek interfejsu zdejmuje
+        # (deque.append/popleft są bezpieczne wątkowo bez blokady)
+        self.inbound: Deque[Dict[str, Any]] = deque()
+        self.message_handlers: Dict[str, List[MessageHandler]] = {}
+        self.scheduler: Optional[Scheduler] = None
+        self._wakeup_pending = False
+        # Stała pętla zdarzeń sieci we własnym wątku (start_loop/submit/shutdown)
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self.backup_player: Optional[str] = None  # Klient, który przejmie grę po awarii hosta
+        self.backup_snapshot: Optional[bytes] = None  # Ostatni zrzut gry (na zapasowym kliencie)
+        self.backup_host: Optional[Dict[str, Any]] = None  # Adres zapasowego hosta (na klientach)
+        self.state_sync = StateSync()  # Wersjonowany stan gry rozsyłany różnicami (host)
+        self.state = StateReplica()  # Kopia stanu gry (klient)
         
-    async def start_server(self):
-        """Uruchamia serwer WebSocket (tylko host)"""
+    async def start_server(self, host_player_name: Optional[str] = None):
+        """Uruchamia serwer WebSocket (tylko host); bez nazwy hosta działa jako serwer dedykowany"""
         if not self.is_host:
             return
         
@@ -37,97 +104,253 @@ class NetworkManager:
             self.server = await websockets.serve(
                 self.handle_client_connection,
                 "0.0.0.0",  # Nasłuchuj na wszystkich interfejsach
-                self.port
+                self.port,
+                compression=None  # Ramki kompresujemy raz (Frame), nie osobno dla każdego klienta
             )
             logger.info(f"Serwer uruchomiony na porcie {self.port}")
             
             # Dodaj hosta do listy graczy
-            from kivy.app import App
-            app = App.get_running_app()
-            if hasattr(app, 'player_name'):
-                self.players[app.player_name] = None  # Host nie ma websocket
+            if host_player_name:
+                self.player_name = host_player_name
+                self.players[host_player_name] = None  # Host nie ma websocket
+                self.state_sync.player_joined(host_player_name)
             
             await self.server.wait_closed()
         except Exception as e:
             logger.error(f"Błąd serwera: {e}")
     
-    async def handle_client_connection(self, websocket, path):
+    @staticmethod
+    async def _iter_messages(websocket, first_message=None):
+        """Wiadomości klienta, poprzedzone już odczytaną (np. przez RoomServer)"""
+        if first_message is not None:
+            yield first_message
+        async for message in websocket:
+            yield message
+    
+    async def handle_client_connection(self, websocket, path=None, first_message=None):
         """Obsługuje połączenie klienta"""
         player_name = None
         try:
-            async for message in websocket:
-                data = json.loads(message)
+            async for message in self._iter_messages(websocket, first_message):
+                data = decode_message(message)
                 
                 if data['type'] == 'join':
                     player_name = data['player_name']
-                    if player_name in self.players:
+                    session = self.sessions.get(player_name)
+                    resuming = session is not None and data.get('resume_token') == session.token
+                    if player_name in self.players and not resuming:
                         await websocket.send(json.dumps({
                             'type': 'error',
                             'message': 'Gracz o tej nazwie już istnieje!'
                         }))
                         continue
                     
+                    # Starsi klienci nie podają kodowań i dostają JSON
+                    encoding = choose_encoding(data.get('encodings'))
+                    old_connection = self.connections.pop(player_name, None)
+                    if old_connection:
+                        old_connection.close()  # Stare połączenie mogło jeszcze nie wygasnąć
                     self.players[player_name] = websocket
-                    logger.info(f"Gracz {player_name} dołączył do gry")
+                    connection = self.connections[player_name] = ClientConnection(
+                        player_name, websocket, self.send_queue_size, self.slow_client_policy,
+                        compress=data.get('compression') == 'zlib', encoding=encoding
+                    )
+                    if resuming:
+                        session.cancel_expiry()
+                    else:
+                        session = self.sessions[player_name] = PlayerSession(player_name, self.replay_buffer_size)
+                        self.link_stats[player_name] = LinkStats(player_name)
+                    self._start_heartbeat()
+                    logger.info(f"Gracz {player_name} {'wrócił do gry' if resuming else 'dołączył do gry'} "
+                                f"(kodowanie: {encoding})")
                     
-                    # Potwierdź dołączenie
-                    await websocket.send(json.dumps({
+                    # Potwierdź dołączenie (poza strumieniem - nie trafia do bufora wznowień)
+                    connection.enqueue(Frame({
                         'type': 'join_success',
-                        'message': 'Pomyślnie dołączono do gry!'
+                        'message': 'Pomyślnie dołączono do gry!',
+                        'encoding': encoding,
+                        'room': self.room_code,
+                        'resume_token': session.token,
+                        'resumed': resuming
                     }))
                     
-                    # Powiadom wszystkich o nowym graczu
-                    await self.broadcast_to_clients({
-                        'type': 'player_joined',
-                        'player_name': player_name,
-                        'players_list': list(self.players.keys())
-                    })
+                    if resuming:
+                        self._deliver(({'type': MSG_PLAYER_BACK, 'player_name': player_name},))
+                        # Tylko przegapione wiadomości; pełny stan, gdy bufor ich już nie obejmuje
+                        missed = session.missed(data.get('last_seq') or 0)
+                        if missed is None:
+                            self._send_frame_to(player_name, self._new_frame(self.state_sync.to_message()))
+                        else:
+                            for frame in missed:
+                                connection.enqueue(frame)
+                        continue
+                    
+                    # Nowy gracz dostaje pełny stan, pozostali tylko różnicę
+                    delta = self.state_sync.player_joined(player_name)
+                    self._send_frame_to(player_name, self._new_frame(self.state_sync.to_message()))
+                    await self.broadcast_to_clients(dict(delta, type='player_joined', player_name=player_name))
+                    self._deliver(({'type': 'player_joined', 'player_name': player_name},))
+                
+                elif data['type'] == MSG_SYNC_REQUEST and self.players.get(player_name) is websocket:
+                    # Klient zgubił zmiany - wyślij zaległą różnicę albo pełny stan
+                    self._send_frame_to(player_name, self._new_frame(self.state_sync.catch_up(data['version'])))
+                
+                elif data['type'] == MSG_PONG and self.players.get(player_name) is websocket:
+                    self._record_pong(player_name, data)
                 
-                elif data['type'] == 'answer':
-                    # Przekaż odpowiedź do logiki gry
-                    with self.message_lock:
-                        self.pending_messages.append(data)
+                elif data['type'] == 'answer' and self.players.get(player_name) is websocket:
+                    # Przekaż odpowiedź do logiki gry (nazwa z połączenia, nie z wiadomości)
+                    data['player_name'] = player_name
+                    self._deliver((data,))
                 
-                elif data['type'] == 'vote':
+                elif data['type'] == 'vote' and self.players.get(player_name) is websocket:
                     # Przekaż głos do logiki gry
-                    with self.message_lock:
-                        self.pending_messages.append(data)
+                    data['player_name'] = player_name
+                    self._deliver((data,))
                 
         except websockets.exceptions.ConnectionClosed:
             logger.info(f"Gracz {player_name} rozłączył się")
         except Exception as e:
             logger.error(f"Błąd obsługi klienta: {e}")
         finally:
-            if player_name and player_name in self.players:
-                del self.players[player_name]
-                # Powiadom pozostałych graczy
-                await self.broadcast_to_clients({
-                    'type': 'player_left',
-                    'player_name': player_name,
-                    'players_list': list(self.players.keys())
-                })
-    
-    async def connect_to_host(self, player_name: str) -> bool:
-        """Łączy się z hostem (tylko klient)"""
+            # Odrzucone dołączenie (zajęta nazwa) ani stare połączenie wznowionego gracza
+            # nie mogą usunąć gracza
+            if player_name and self.players.get(player_name) is websocket:
+                connection = self.connections.pop(player_name, None)
+                if connection:
+                    connection.stop()
+                session = self.sessions.get(player_name)
+                if session is not None and self.resume_grace > 0 and not self._closing:
+                    # Zachowaj miejsce gracza - może wrócić z tokenem wznowienia
+                    session.expiry = asyncio.get_running_loop().call_later(
+                        self.resume_grace, self._expire_session, player_name, websocket)
+                    self._deliver(({'type': MSG_PLAYER_AWAY, 'player_name': player_name},))
+                else:
+                    await self._remove_player(player_name)
+    
+    def _expire_session(self, player_name: str, websocket):
+        """Gracz nie wrócił na czas - usuń go z gry"""
+        if self.players.get(player_name) is websocket:
+            logger.info(f"Gracz {player_name} nie wrócił do gry")
+            asyncio.create_task(self._remove_player(player_name))
+    
+    async def _remove_player(self, player_name: str):
+        """Usuwa gracza i powiadamia pozostałych"""
+        self.players.pop(player_name, None)
+        session = self.sessions.pop(player_name, None)
+        if session is not None:
+            session.cancel_expiry()
+        self.link_stats.pop(player_name, None)
+        delta = self.state_sync.player_left(player_name)
+        if delta:
+            await self.broadcast_to_clients(dict(delta, type='player_left', player_name=player_name))
+        self._deliver(({'type': 'player_left', 'player_name': player_name},))
+    
+    def _start_heartbeat(self):
+        if self.heartbeat_interval and self._heartbeat_task is None:
+            self._heartbeat_task = asyncio.get_running_loop().create_task(self._heartbeat_loop())
+    
+    async def _heartbeat_loop(self):
+        """Wysyła ping do połączonych graczy i przekazuje raport łączy (działa, póki ktoś jest połączony)"""
+        try:
+            while self.connections and not self._closing:
+                self._ping_id += 1
+                self._ping_times.append((self._ping_id, time.monotonic()))
+                # Jedna ramka dla wszystkich; ping nie dostaje numeru strumienia, więc nie trafia do bufora wznowień
+                ping = Frame({'type': MSG_PING, 'id': self._ping_id})
+                for player_name, connection in self.connections.items():
+                    stats = self.link_stats.get(player_name)
+                    if stats is not None:
+                        stats.pings_sent += 1
+                    connection.enqueue(ping)
+                await asyncio.sleep(self.heartbeat_interval)
+                self._deliver(({'type': MSG_LINK_STATS, 'players': self.get_link_report()},))
+        except Exception as e:
+            logger.error(f"Błąd pomiaru łącza: {e}")
+        finally:
+            self._heartbeat_task = None
+    
+    def _record_pong(self, player_name: str, data: Dict[str, Any]):
+        """Zapisuje RTT i różnicę zegarów z odpowiedzi na ping"""
+        stats = self.link_stats.get(player_name)
+        # Czas wysłania znamy tylko my - klient nie może podać sobie większego opóźnienia
+        sent = next((sent for ping_id, sent in self._ping_times if ping_id == data.get('id')), None)
+        if stats is None or sent is None:
+            return
+        try:
+            client_time = float(data['client_time'])
+        except (KeyError, TypeError, ValueError):
+            return
+        now = time.monotonic()
+        rtt = now - sent
+        # Klient odpowiedział mniej więcej w połowie drogi pingu i odpowiedzi
+        stats.add_sample(rtt, client_time - (time.time() - rtt / 2), now)
+    
+    def get_link_stats(self, player_name: str) -> Optional[LinkStats]:
+        """Statystyki łącza gracza (tylko host)"""
+        return self.link_stats.get(player_name)
+    
+    def get_link_report(self) -> Dict[str, Dict[str, Any]]:
+        """Podsumowanie łączy wszystkich graczy, np. do wyświetlenia na ekranie hosta"""
+        now = time.monotonic()
+        max_silence = 3 * (self.heartbeat_interval or 0)
+        report = {}
+        for player_name, stats in list(self.link_stats.items()):
+            summary = stats.to_dict()
+            summary['connected'] = player_name in self.connections
+            summary['laggy'] = stats.is_laggy(self.lag_threshold, now, max_silence)
+            report[player_name] = summary
+        return report
+    
+    def get_laggy_players(self) -> List[str]:
+        """Gracze z wolnym łączem albo bez odpowiedzi na ostatnie pingi"""
+        return [player_name for player_name, summary in self.get_link_report().items() if summary['laggy']]
+    
+    async def connect_to_host(self, player_name: str, room_code: Optional[str] = None,
+                              create_room: bool = False) -> bool:
+        """Łączy się z hostem (tylko klient); na serwerze wielu stołów podaj kod pokoju"""
         if self.is_host:
             return False
         
         try:
             uri = f"ws://{self.host_ip}:{self.port}"
             self.client_websocket = await websockets.connect(uri)
-            self.player_name = player_name
+            self._closing = False
             
             # Wyślij żądanie dołączenia
+            resuming = bool(self.resume_token) and player_name == self.player_name
+            self.player_name = player_name
             await self.client_websocket.send(json.dumps({
                 'type': 'join',
-                'player_name': player_name
+                'player_name': player_name,
+                'compression': 'zlib',  # Duże wiadomości mogą przychodzić skompresowane
+                'encodings': list(SUPPORTED_ENCODINGS),
+                'room': room_code or self.room_code,
+                'create_room': create_room,
+                # Po zerwaniu połączenia wracamy na swoje miejsce i dostajemy tylko zaległe wiadomości
+                'resume_token': self.resume_token if resuming else None,
+                'last_seq': self.last_seq if resuming else 0
             }))
             
             # Czekaj na potwierdzenie
             response = await self.client_websocket.recv()
-            data = json.loads(response)
+            data = decode_message(response)
+            
+            if data['type'] == MSG_REDIRECT:
+                # Pokój jest w innym procesie serwera - dołącz przez jego port
+                await self.client_websocket.close()
+                self.port = data['port']
+                return await self.connect_to_host(player_name, data.get('room'))
             
             if data['type'] == 'join_success':
+                # Host starszej wersji nie podaje kodowania - zostaje JSON
+                self.encoding = data.get('encoding', ENCODING_JSON)
+                self.room_code = data.get('room')
+                self.resume_token = data.get('resume_token')
+                if not data.get('resumed'):
+                    # Nowe miejsce w grze - stan przyjdzie od początku
+                    self.last_seq = 0
+                    self.state = StateReplica()
                 # Uruchom nasłuchiwanie wiadomości
                 asyncio.create_task(self.listen_for_messages())
                 return True
@@ -142,64 +365,324 @@ class NetworkManager:
         """Nasłuchuje wiadomości od serwera (tylko klient)"""
         try:
             async for message in self.client_websocket:
-                data = json.loads(message)
-                with self.message_lock:
-                    self.pending_messages.append(data)
+                data = decode_message(message)
+                if data['type'] == MSG_PING:
+                    # Odpowiedz od razu - host mierzy czas odpowiedzi i różnicę zegarów
+                    await self.client_websocket.send(encode_message(
+                        {'type': MSG_PONG, 'id': data['id'], 'client_time': time.time()}, self.encoding))
+                    continue
+                seq = data.get('seq')
+                if seq is not None:
+                    if seq <= self.last_seq:
+                        continue  # Już odebrana (powtórzona przy wznowieniu)
+                    self.last_seq = seq
+                batch = data['messages'] if data['type'] == MSG_BATCH else [data]
+                received = []
+                out_of_sync = False
+                for data in batch:
+                    if data['type'] == 'host_snapshot':
+                        # Ten klient jest zapasowym hostem - zachowaj tylko najnowszy zrzut
+                        self.backup_snapshot = base64.b64decode(data['data'])
+                        continue
+                    if data['type'] == 'backup_host':
+                        self.backup_host = data
+                    if 'version' in data and not self.state.apply_message(data):
+                        out_of_sync = True
+                    received.append(data)
+                if out_of_sync:
+                    # Brakuje wcześniejszych zmian stanu - poproś hosta o zaległe
+                    await self.client_websocket.send(encode_message(self.state.sync_request(), self.encoding))
+                self._deliver(received)
         except websockets.exceptions.ConnectionClosed:
             logger.info("Połączenie z serwerem zostało zamknięte")
         except Exception as e:
             logger.error(f"Błąd nasłuchiwania wiadomości: {e}")
+        if not self._closing and self.resume_token:
+            asyncio.create_task(self._resume_session())
+    
+    async def _resume_session(self):
+        """Próbuje wrócić do gry po zerwanym połączeniu (tylko klient)"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.resume_timeout
+        delay = 0.5
+        while not self._closing and not self.is_host and loop.time() < deadline:
+            await asyncio.sleep(delay)
+            if await self.connect_to_host(self.player_name, self.room_code):
+                logger.info("Wznowiono połączenie z hostem")
+                self._deliver(({'type': 'reconnected'},))
+                return
+            delay = min(delay * 2, 5.0)
+        if not self.is_host:  # Zapasowy klient mógł w tym czasie przejąć grę
+            self._deliver(({'type': 'connection_lost'},))
+    
+    def start_loop(self) -> asyncio.AbstractEventLoop:
+        """Uruchamia wątek z pętlą zdarzeń sieci (tylko za pierwszym razem)"""
+        if self.loop is None:
+            self.loop = asyncio.new_event_loop()
+            self._loop_thread = threading.Thread(target=self._run_loop, args=(self.loop,),
+                                                 name="network-loop", daemon=True)
+            self._loop_thread.start()
+        return self.loop
+    
+    def _run_loop(self, loop: asyncio.AbstractEventLoop):
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+            # Dokończ anulowanie zadań, które zostały po zamknięciu połączeń
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        except Exception as e:
+            logger.error(f"Błąd pętli sieci: {e}")
+        finally:
+            loop.close()
+    
+    def submit(self, coroutine) -> Future:
+        """Zleca korutynę pętli sieci z dowolnego wątku bez czekania; zwraca Future z wynikiem"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.start_loop())
+    
+    def _spawn(self, coroutine):
+        """Uruchamia korutynę w pętli sieci - z wątku interfejsu albo z samej pętli"""
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is not None and (self.loop is None or running is self.loop):
+            return running.create_task(coroutine)
+        return self.submit(coroutine)
+    
+    def shutdown(self, timeout: float = 5.0):
+        """Zamyka połączenia i zatrzymuje wątek sieci (nie wywoływać z wątku sieci)"""
+        if self.loop is None:
+            return
+        loop, thread = self.loop, self._loop_thread
+        try:
+            self.submit(self.close()).result(timeout)
+        except Exception as e:
+            logger.error(f"Błąd podczas zamykania połączeń: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        self.loop = None
+        self._loop_thread = None
     
     def send_message(self, message: Dict[str, Any]):
-        """Wysyła wiadomość (klient do serwera)"""
+        """Wysyła wiadomość (klient do serwera); zwraca Future"""
         if not self.is_host and self.client_websocket:
-            asyncio.create_task(self._send_message_async(message))
+            return self._spawn(self._send_message_async(message))
     
     async def _send_message_async(self, message: Dict[str, Any]):
         """Asynchronicznie wysyła wiadomość"""
         try:
-            await self.client_websocket.send(json.dumps(message))
+            await self.client_websocket.send(encode_message(message, self.encoding))
         except Exception as e:
             logger.error(f"Błąd wysyłania wiadomości: {e}")
     
     def broadcast_message(self, message: Dict[str, Any]):
-        """Wysyła wiadomość do wszystkich klientów (tylko host)"""
+        """Wysyła wiadomość do wszystkich klientów (tylko host); zwraca Future"""
         if self.is_host:
-            asyncio.create_task(self.broadcast_to_clients(message))
+            return self._spawn(self.broadcast_to_clients(message))
     
     async def broadcast_to_clients(self, message: Dict[str, Any]):
-        """Asynchronicznie wysyła wiadomość do wszystkich klientów"""
-        if not self.players:
+        """Dodaje wiadomość do kolejek wszystkich klientów (wysyłanie odbywa się równolegle)"""
+        if not self.sessions:
             return
-        
-        # Wyślij do wszystkich klientów (pomijając hosta)
-        disconnected = []
-        for player_name, websocket in self.players.items():
-            if websocket is None:  # Host
-                continue
-            try:
-                await websocket.send(json.dumps(message))
-            except websockets.exceptions.ConnectionClosed:
-                disconnected.append(player_name)
-            except Exception as e:
-                logger.error(f"Błąd wysyłania do {player_name}: {e}")
-                disconnected.append(player_name)
-        
-        # Usuń rozłączonych graczy
-        for player_name in disconnected:
-            if player_name in self.players:
-                del self.players[player_name]
+        if self.coalesce_interval:
+            self._coalesce(message)
+            return
+        self._enqueue_frame(self._new_frame(message))
+    
+    def _new_frame(self, message: Dict[str, Any]) -> Frame:
+        """Ramka z kolejnym numerem strumienia hosta (do wznawiania sesji)"""
+        self._seq += 1
+        return Frame(dict(message, seq=self._seq), self._seq)
+    
+    def _send_frame_to(self, player_name: str, frame: Frame) -> bool:
+        """Wysyła ramkę do gracza; rozłączony gracz dostanie ją po powrocie"""
+        session = self.sessions.get(player_name)
+        if session is None:
+            return False
+        session.record(frame)
+        connection = self.connections.get(player_name)
+        return connection is not None and connection.enqueue(frame)
+    
+    def _enqueue_frame(self, frame: Frame):
+        # Host nie ma kolejki; wolni klienci są obsługiwani wg slow_client_policy,
+        # a rozłączeni czekają na powrót albo znikają z gry po czasie resume_grace
+        for player_name in list(self.sessions):
+            self._send_frame_to(player_name, frame)
+    
+    def _coalesce(self, message: Dict[str, Any]):
+        """Odkłada rozgłoszenie do końca okna, zastępując starszą wiadomość tego samego rodzaju"""
+        if message.get('type') in REPLACEABLE_TYPES:
+            key = message['type']
+            # Najnowsza wersja trafia na koniec, za wiadomości wysłane przed nią
+            self._outbox.pop(key, None)
+        else:
+            self._outbox_serial += 1
+            key = self._outbox_serial
+        self._outbox[key] = message
+        if self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(self.coalesce_interval, self._flush_outbox)
+    
+    def _flush_outbox(self):
+        """Wysyła rozgłoszenia z okna jako jedną ramkę"""
+        self._flush_handle = None
+        messages = list(self._outbox.values())
+        self._outbox.clear()
+        if not messages:
+            return
+        if len(messages) == 1:
+            self._enqueue_frame(self._new_frame(messages[0]))
+        else:
+            self._enqueue_frame(self._new_frame({'type': MSG_BATCH, 'messages': messages}))
+    
+    async def broadcast_answer_count(self, done: int, total: int, voting: bool = False):
+        """Rozsyła postęp odpowiedzi lub głosowania (w oknie łączenia liczy się tylko ostatni)"""
+        await self.broadcast_to_clients({
+            'type': 'vote_count' if voting else 'answer_count',
+            'done': done,
+            'total': total
+        })
+    
+    async def send_to_client(self, player_name: str, message: Dict[str, Any]) -> bool:
+        """Wysyła wiadomość do jednego klienta (np. jego fragment rankingu)"""
+        if self._flush_handle is not None:
+            # Rozgłoszenia z bieżącego okna muszą dotrzeć przed wiadomością do gracza
+            self._flush_handle.cancel()
+            self._flush_outbox()
+        return self._send_frame_to(player_name, self._new_frame(message))
+    
+    async def broadcast_state_delta(self, delta: Optional[Dict[str, Any]]):
+        """Rozsyła różnicę stanu, jeśli coś się zmieniło (tylko host)"""
+        if delta:
+            await self.broadcast_to_clients(delta)
+    
+    async def sync_round(self, round_number: int):
+        """Rozsyła początek nowej rundy"""
+        await self.broadcast_state_delta(self.state_sync.start_round(round_number))
+    
+    async def sync_answer_groups(self, groups: List[Dict[str, Any]]):
+        """Rozsyła zmienione grupy odpowiedzi (z GameLogic.pop_grouping_changes)"""
+        await self.broadcast_state_delta(self.state_sync.update_groups(groups))
+    
+    def choose_backup_player(self) -> Optional[str]:
+        """Wybiera klienta, który przejmie grę po awarii hosta (tylko spośród połączonych)"""
+        if self.backup_player in self.connections:
+            return self.backup_player
+        return next(iter(self.connections), None)
+    
+    async def push_snapshot(self, snapshot: bytes, backup_player: Optional[str] = None) -> bool:
+        """Wysyła zrzut gry do zapasowego hosta (tylko host)"""
+        backup = backup_player or self.choose_backup_player()
+        if backup is None or backup not in self.connections:
+            return False
+        if backup != self.backup_player:
+            self.backup_player = backup
+            # Powiadom wszystkich, dokąd się połączyć, gdy host zniknie
+            remote_address = self.connections[backup].websocket.remote_address
+            await self.broadcast_to_clients({
+                'type': 'backup_host',
+                'player_name': backup,
+                'host_ip': remote_address[0] if remote_address else None,
+                'port': self.port
+            })
+        return await self.send_to_client(backup, {
+            'type': 'host_snapshot',
+            'data': base64.b64encode(snapshot).decode('ascii')
+        })
+    
+    def send_snapshot_to_backup(self, snapshot: bytes):
+        """Wysyła zrzut gry do zapasowego hosta bez czekania (tylko host); zwraca Future"""
+        if self.is_host:
+            return self._spawn(self.push_snapshot(snapshot))
+    
+    def promote_to_host(self, game_logic) -> bool:
+        """Zmienia zapasowego klienta w hosta: odtwarza grę ze zrzutu i uruchamia serwer,
+        z którym łączą się pozostali gracze (reconnect_to_backup_host)"""
+        if self.is_host or self.backup_snapshot is None:
+            return False
+        game_logic.restore_snapshot(self.backup_snapshot)
+        self.is_host = True
+        self.client_websocket = None
+        self.resume_token = None  # Do starego hosta już nie wracamy
+        self._closing = False
+        self.players = {}
+        self.connections = {}
+        self.sessions = {}
+        self.link_stats = {}
+        self.state_sync = StateSync()
+        logger.info(f"Gracz {self.player_name} przejmuje rolę hosta")
+        self._spawn(self.start_server(self.player_name))
+        return True
+    
+    async def reconnect_to_backup_host(self) -> bool:
+        """Łączy się z zapasowym hostem po utracie hosta (tylko klient)"""
+        if self.is_host or not self.backup_host or not self.backup_host.get('host_ip'):
+            return False
+        if self.backup_host['player_name'] == self.player_name:
+            return False
+        self.host_ip = self.backup_host['host_ip']
+        self.port = self.backup_host.get('port', self.port)
+        return await self.connect_to_host(self.player_name)
     
     def get_players_list(self) -> List[str]:
         """Zwraca listę graczy"""
+        if not self.is_host:
+            return list(self.state.players)
         return list(self.players.keys())
     
+    def set_scheduler(self, scheduler: Optional[Scheduler]):
+        """Ustawia sposób budzenia wątku interfejsu (np. Clock.schedule_once w Kivy)"""
+        self.scheduler = scheduler
+        if scheduler and self.inbound:
+            self._schedule_dispatch()
+    
+    def on_message(self, message_type: str, handler: MessageHandler):
+        """Rejestruje obsługę wiadomości danego typu (ANY_MESSAGE = wszystkie)"""
+        self.message_handlers.setdefault(message_type, []).append(handler)
+    
+    def remove_message_handler(self, message_type: str, handler: MessageHandler):
+        """Usuwa obsługę wiadomości"""
+        handlers = self.message_handlers.get(message_type, [])
+        if handler in handlers:
+            handlers.remove(handler)
+    
+    def _deliver(self, messages):
+        """Przekazuje wiadomości do wątku interfejsu - jedno wybudzenie na paczkę (wątek sieci)"""
+        if not messages:
+            return
+        self.inbound.extend(messages)
+        if self.scheduler and not self._wakeup_pending:
+            self._schedule_dispatch()
+    
+    def _schedule_dispatch(self):
+        self._wakeup_pending = True
+        self.scheduler(self.dispatch_pending)
+    
+    def dispatch_pending(self):
+        """Wywołuje obsługę wszystkich oczekujących wiadomości (wątek interfejsu)"""
+        # Flaga przed opróżnieniem kolejki: wiadomość dopisana później wywoła nowe wybudzenie
+        self._wakeup_pending = False
+        for message in self.get_pending_messages():
+            handlers = self.message_handlers.get(message.get('type'), []) + self.message_handlers.get(ANY_MESSAGE, [])
+            if not handlers:
+                logger.debug(f"Brak obsługi wiadomości typu {message.get('type')}")
+            for handler in handlers:
+                try:
+                    handler(message)
+                except Exception as e:
+                    logger.error(f"Błąd obsługi wiadomości {message.get('type')}: {e}")
+    
     def get_pending_messages(self) -> List[Dict[str, Any]]:
         """Pobiera oczekujące wiadomości"""
-        with self.message_lock:
-            messages = self.pending_messages.copy()
-            self.pending_messages.clear()
-            return messages
+        messages = []
+        inbound = self.inbound
+        while inbound:
+            messages.append(inbound.popleft())
+        return messages
     
     def disconnect(self):
         """Rozłącza się z siecią"""
@@ -207,30 +690,46 @@ class NetworkManager:
             if self.is_host and self.server:
                 # Sprawdź czy jest aktywna pętla zdarzeń
                 try:
-                    loop = asyncio.get_running_loop()
-                    asyncio.create_task(self._close_server())
+                    asyncio.get_running_loop()
+                    self._spawn(self._close_server())
                 except RuntimeError:
-                    # Brak aktywnej pętli, zamknij synchronicznie
-                    if self.server:
+                    if self.loop is not None:
+                        self.submit(self._close_server())
+                    elif self.server:
+                        # Brak aktywnej pętli, zamknij synchronicznie
                         self.server.close()
             elif not self.is_host and self.client_websocket:
                 try:
-                    loop = asyncio.get_running_loop()
-                    asyncio.create_task(self._close_client())
+                    asyncio.get_running_loop()
+                    self._spawn(self._close_client())
                 except RuntimeError:
-                    # Brak aktywnej pętli, nie rób nic
-                    pass
+                    if self.loop is not None:
+                        self.submit(self._close_client())
         except Exception as e:
             logger.error(f"Błąd podczas rozłączania: {e}")
     
+    async def close(self):
+        """Zamyka serwer (host) albo połączenie z hostem (klient)"""
+        if self.is_host:
+            await self._close_server()
+        else:
+            await self._close_client()
+    
     async def _close_server(self):
         """Zamyka serwer"""
+        self._closing = True  # Zamykane połączenia nie czekają na wznowienie
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_outbox()
         if self.server:
             self.server.close()
             await self.server.wait_closed()
     
     async def _close_client(self):
         """Zamyka połączenie klienta"""
+        self._closing = True  # Celowe rozłączenie - bez prób wznowienia
         if self.client_websocket:
             await self.client_websocket.close()
     
@@ -0,0 +1,41 @@
+"""
+Moduł sesji gracza - token wznowienia i bufor ostatnich wiadomości wysłanych do gracza,
+dzięki którym gracz po utracie Wi-Fi wraca na swoje miejsce i dostaje tylko to, co przegapił
+"""
+
+import asyncio
+import secrets
+from collections import deque
+from typing import Deque, List, Optional
+
+from message_frame import Frame
+
+
+class PlayerSession:
+    """Sesja jednego gracza po stronie hosta"""
+
+    __slots__ = ("player_name", "token", "buffer", "evicted_seq", "expiry")
+
+    def __init__(self, player_name: str, buffer_size: int = 256):
+        self.player_name = player_name
+        self.token = secrets.token_urlsafe(16)
+        self.buffer: Deque[Frame] = deque(maxlen=buffer_size)  # Ostatnie ramki do gracza
+        self.evicted_seq = 0  # Numer najnowszej ramki, która wypadła z bufora
+        self.expiry: Optional[asyncio.TimerHandle] = None  # Usunięcie gracza po czasie na powrót
+
+    def record(self, frame: Frame):
+        """Zapamiętuje ramkę wysłaną (lub do wysłania po powrocie) do gracza"""
+        if len(self.buffer) == self.buffer.maxlen:
+            self.evicted_seq = self.buffer[0].seq
+        self.buffer.append(frame)
+
+    def missed(self, last_seq: int) -> Optional[List[Frame]]:
+        """Ramki po last_seq albo None, gdy część z nich wypadła już z bufora"""
+        if last_seq < self.evicted_seq:
+            return None
+        return [frame for frame in self.buffer if frame.seq > last_seq]
+
+    def cancel_expiry(self):
+        if self.expiry is not None:
+            self.expiry.cancel()
+            self.expiry = None
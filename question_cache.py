@@ -0,0 +1,118 @@
+"""
+Moduł skompilowanej pamięci podręcznej pytań - pozwala pominąć parsowanie
+plików z pytaniami, gdy nie zmieniły się od ostatniego uruchomienia
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import List, Optional, Sequence
+import logging
+
+from question_packs import Question
+
+logger = logging.getLogger(__name__)
+
+CACHE_SUFFIX = ".cache"
+CACHE_VERSION = 4  # 4: JSON zamiast pickle (cache może leżeć we wspólnym katalogu paczek)
+
+
+def get_cache_path(bank_path: str) -> str:
+    """Zwraca ścieżkę pliku cache leżącego obok banku pytań"""
+    return bank_path + CACHE_SUFFIX
+
+
+def _file_hash(path: str) -> str:
+    """Liczy skrót zawartości pliku"""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_cached_questions(cache_path: str,
+                          source_files: Sequence[str]) -> Optional[List[Question]]:
+    """Wczytuje pytania z cache albo zwraca None, gdy cache jest nieaktualny"""
+    try:
+        stats = [os.stat(path) for path in source_files]
+        with open(cache_path, encoding="utf-8") as f:
+            cached = json.load(f)
+    except OSError:
+        return None
+    except ValueError as e:
+        logger.warning(f"Uszkodzony cache pytań {cache_path}: {e}")
+        return None
+
+    if not isinstance(cached, dict) or cached.get("version") != CACHE_VERSION:
+        return None
+    try:
+        # Same napisy i liczby - zawartość pliku nie może wykonać kodu ani podmienić typów
+        sources = [(str(path), int(mtime), int(size), str(content_hash))
+                   for path, mtime, size, content_hash in cached["sources"]]
+        if [source[0] for source in sources] != list(source_files):
+            return None
+        questions = [(str(question), str(answer), tuple(str(alias) for alias in aliases))
+                     for question, answer, aliases in cached["questions"]]
+    except (KeyError, TypeError, ValueError) as e:
+        logger.warning(f"Uszkodzony cache pytań {cache_path}: {e}")
+        return None
+
+    # Szybka ścieżka - czas modyfikacji i rozmiar każdego pliku bez zmian
+    if all(source[1] == stat.st_mtime_ns and source[2] == stat.st_size
+           for source, stat in zip(sources, stats)):
+        return questions
+
+    # Pliki zostały dotknięte lub skopiowane - porównaj zawartość
+    hashes = []
+    for source, stat in zip(sources, stats):
+        if source[2] != stat.st_size:
+            return None
+        content_hash = source[3] if source[1] == stat.st_mtime_ns else _file_hash(source[0])
+        if content_hash != source[3]:
+            return None
+        hashes.append(content_hash)
+    save_questions_cache_async(cache_path, source_files, questions, hashes)
+    return questions
+
+
+def save_questions_cache(cache_path: str, source_files: Sequence[str],
+                         questions: List[Question],
+                         content_hashes: Optional[List[str]] = None):
+    """Zapisuje pytania do cache (atomowo, przez plik tymczasowy)"""
+    tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        sources = []
+        for i, path in enumerate(source_files):
+            stat = os.stat(path)
+            content_hash = content_hashes[i] if content_hashes else _file_hash(path)
+            sources.append((path, stat.st_mtime_ns, stat.st_size, content_hash))
+        cached = {
+            "version": CACHE_VERSION,
+            "sources": sources,
+            "questions": list(questions),
+        }
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cached, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, cache_path)
+        logger.info(f"Zapisano cache {len(questions)} pytań: {cache_path}")
+    except Exception as e:
+        logger.error(f"Błąd zapisu cache pytań: {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def save_questions_cache_async(cache_path: str, source_files: Sequence[str],
+                               questions: List[Question],
+                               content_hashes: Optional[List[str]] = None) -> threading.Thread:
+    """Przebudowuje cache w tle, nie blokując startu gry"""
+    # Wątek nie jest demonem, żeby zamknięcie aplikacji nie przerwało zapisu
+    thread = threading.Thread(
+        target=save_questions_cache,
+        args=(cache_path, list(source_files), list(questions), content_hashes)
+    )
+    thread.start()
+    return thread
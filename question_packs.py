@@ -0,0 +1,189 @@
+"""
+Moduł paczek pytań - łączy pytania z wielu plików (xlsx, csv, json)
+i usuwa duplikaty
+"""
+
+import csv
+import hashlib
+import json
+import os
+import re
+from typing import Iterable, Iterator, List, Sequence, Tuple, Union
+import logging
+
+from answer_matching import parse_aliases
+
+logger = logging.getLogger(__name__)
+
+PACK_EXTENSIONS = (".xlsx", ".csv", ".json")
+HEADER_NAMES = {"pytanie", "question"}
+ALIAS_HEADER_NAMES = {"aliasy", "aliases", "alias"}
+
+Question = Tuple[str, str, Tuple[str, ...]]  # (pytanie, odpowiedź, aliasy)
+
+QuestionSource = Union[str, Sequence[str]]
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def resolve_pack_files(source: QuestionSource) -> List[str]:
+    """Zamienia plik, katalog lub listę ścieżek na listę plików z pytaniami"""
+    paths = [source] if isinstance(source, str) else list(source)
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                dirs.sort()
+                for name in sorted(names):
+                    if name.lower().endswith(PACK_EXTENSIONS) and not name.startswith((".", "~$")):
+                        files.append(os.path.join(root, name))
+        else:
+            files.append(path)
+    return files
+
+
+def get_bank_path(source: QuestionSource) -> str:
+    """Zwraca ścieżkę bazową dla plików pomocniczych banku (cache, rotacja)"""
+    if isinstance(source, str):
+        if os.path.isdir(source):
+            return os.path.join(source, ".questions")
+        return source
+    paths = [os.path.abspath(path) for path in source]
+    if len(paths) == 1:
+        return get_bank_path(paths[0])
+    digest = hashlib.sha1("\n".join(paths).encode("utf-8")).hexdigest()[:12]
+    if not paths:
+        base_dir = "."
+    elif os.path.isdir(paths[0]):
+        base_dir = paths[0]
+    else:
+        base_dir = os.path.dirname(paths[0])
+    return os.path.join(base_dir, f".questions-{digest}")
+
+
+def _make_question(question, answer, aliases=None) -> Union[Question, None]:
+    """Normalizuje pytanie, odpowiedź i aliasy lub zwraca None dla pustych"""
+    if not question or not answer:
+        return None
+    return (str(question).strip(), str(answer).strip().lower(), parse_aliases(aliases))
+
+
+def _find_alias_column(header: Sequence) -> Union[int, None]:
+    """Szuka kolumny z aliasami odpowiedzi po nazwie nagłówka"""
+    for position, name in enumerate(header):
+        if name and str(name).strip().lower() in ALIAS_HEADER_NAMES:
+            return position
+    return None
+
+
+def iter_xlsx_questions(path: str) -> Iterator[Question]:
+    """Czyta pytania ze wszystkich arkuszy skoroszytu"""
+    import openpyxl  # Dopiero przy czytaniu - start z cache pytań go nie potrzebuje
+    workbook = openpyxl.load_workbook(path, read_only=True)
+    try:
+        for sheet in workbook.worksheets:
+            rows = sheet.iter_rows(values_only=True)
+            alias_column = _find_alias_column(next(rows, ()))  # Nagłówek
+            for row in rows:
+                if len(row) >= 2:
+                    aliases = None
+                    if alias_column is not None and alias_column < len(row):
+                        aliases = row[alias_column]
+                    question = _make_question(row[0], row[1], aliases)
+                    if question:
+                        yield question
+    finally:
+        workbook.close()
+
+
+def iter_csv_questions(path: str) -> Iterator[Question]:
+    """Czyta pytania z pliku CSV (pytanie, odpowiedź, opcjonalnie aliasy)"""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        sample = f.read(4096)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        alias_column = None
+        for line_number, row in enumerate(csv.reader(f, dialect)):
+            if len(row) < 2:
+                continue
+            if line_number == 0 and row[0].strip().lower() in HEADER_NAMES:
+                alias_column = _find_alias_column(row)
+                continue
+            aliases = None
+            if alias_column is not None and alias_column < len(row):
+                aliases = row[alias_column]
+            question = _make_question(row[0], row[1], aliases)
+            if question:
+                yield question
+
+
+def iter_json_questions(path: str) -> Iterator[Question]:
+    """Czyta pytania z pliku JSON (lista par lub obiektów)"""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("questions", data.get("pytania", []))
+    for item in data:
+        if isinstance(item, dict):
+            question = _make_question(
+                item.get("question", item.get("pytanie")),
+                item.get("answer", item.get("odpowiedź", item.get("odpowiedz"))),
+                item.get("aliases", item.get("aliasy"))
+            )
+        elif isinstance(item, (list, tuple)) and len(item) >= 2:
+            question = _make_question(item[0], item[1], item[2] if len(item) > 2 else None)
+        else:
+            question = None
+        if question:
+            yield question
+
+
+_READERS = {
+    ".xlsx": iter_xlsx_questions,
+    ".csv": iter_csv_questions,
+    ".json": iter_json_questions,
+}
+
+
+def iter_pack_questions(files: Iterable[str]) -> Iterator[Question]:
+    """Strumieniowo czyta pytania z kolejnych plików (bez usuwania duplikatów)"""
+    for path in files:
+        reader = _READERS.get(os.path.splitext(path)[1].lower())
+        if reader is None:
+            logger.warning(f"Nieobsługiwany format paczki pytań: {path}")
+            continue
+        try:
+            yield from reader(path)
+        except Exception as e:
+            logger.error(f"Błąd czytania paczki {path}: {e}")
+
+
+def normalize_for_dedup(text: str) -> str:
+    """Postać tekstu używana do wykrywania duplikatów"""
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+
+def question_key(question: str, answer: str) -> bytes:
+    """Skrót znormalizowanej pary (pytanie, odpowiedź)"""
+    normalized = f"{normalize_for_dedup(question)}\x00{normalize_for_dedup(answer)}"
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).digest()
+
+
+def load_packs(files: Iterable[str]) -> List[Question]:
+    """Łączy pytania z wielu paczek, pomijając duplikaty"""
+    seen_keys = set()
+    questions = []
+    duplicates = 0
+    for entry in iter_pack_questions(files):
+        key = question_key(entry[0], entry[1])
+        if key in seen_keys:
+            duplicates += 1
+            continue
+        seen_keys.add(key)
+        questions.append(entry)
+    if duplicates:
+        logger.info(f"Pominięto {duplicates} zduplikowanych pytań")
+    return questions
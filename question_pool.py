@@ -0,0 +1,79 @@
+"""
+Moduł współdzielonej puli pytań - jeden niezmienny zestaw pytań na bank,
+współdzielony przez wszystkie gry w procesie
+"""
+
+import os
+import sys
+import threading
+import weakref
+from array import array
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+import logging
+
+from answer_matching import AnswerMatcher
+from question_rotation import question_hash
+
+logger = logging.getLogger(__name__)
+
+
+class QuestionPool:
+    """Niezmienna, internowana lista pytań (pytanie, odpowiedź, aliasy)"""
+
+    __slots__ = ("key", "questions", "_hashes", "_matchers", "__weakref__")
+
+    def __init__(self, questions: Iterable[Tuple[str, ...]], key: Optional[Hashable] = None):
+        self.key = key
+        self.questions: Tuple[Tuple[str, str, Tuple[str, ...]], ...] = tuple(
+            (
+                sys.intern(entry[0]),
+                sys.intern(entry[1]),
+                tuple(sys.intern(alias) for alias in entry[2]) if len(entry) > 2 else ()
+            )
+            for entry in questions
+        )
+        self._hashes: Optional[array] = None
+        self._matchers: Dict[int, AnswerMatcher] = {}
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+    def __getitem__(self, index: int) -> Tuple[str, str, Tuple[str, ...]]:
+        return self.questions[index]
+
+    def get_matcher(self, index: int) -> AnswerMatcher:
+        """Zwraca dopasowywacz odpowiedzi pytania (budowany raz, przy pierwszym użyciu)"""
+        matcher = self._matchers.get(index)
+        if matcher is None:
+            _, answer, aliases = self.questions[index]
+            matcher = AnswerMatcher(answer, aliases)
+            self._matchers[index] = matcher
+        return matcher
+
+    def get_hashes(self) -> array:
+        """Zwraca stabilne skróty pytań (liczone raz na pulę)"""
+        if self._hashes is None:
+            self._hashes = array('Q', (question_hash(entry[0]) for entry in self.questions))
+        return self._hashes
+
+
+# Pule żyją tak długo, jak długo korzysta z nich choć jedna gra
+_pools: "weakref.WeakValueDictionary[Hashable, QuestionPool]" = weakref.WeakValueDictionary()
+_pools_lock = threading.Lock()
+
+
+def get_shared_pool(source_files: Sequence[str],
+                    loader: Callable[[], List[Tuple[str, ...]]]) -> QuestionPool:
+    """Zwraca wspólną pulę dla zestawu plików, wczytując ją tylko przy pierwszym użyciu lub po zmianie"""
+    key = []
+    for path in source_files:
+        stat = os.stat(path)
+        key.append((os.path.abspath(path), stat.st_mtime_ns, stat.st_size))
+    key = tuple(key)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = QuestionPool(loader(), key)
+            _pools[key] = pool
+            logger.info(f"Utworzono wspólną pulę {len(pool)} pytań z {len(source_files)} plików")
+        return pool
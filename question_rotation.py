@@ -0,0 +1,113 @@
+"""
+Moduł rotacji pytań - trwały zapis już zadanych pytań, żeby stali gracze
+nie dostawali tych samych pytań co kilka gier
+"""
+
+import hashlib
+import os
+import struct
+import threading
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+ROTATION_SUFFIX = ".seen"
+_HEADER = struct.Struct("<4sI")  # magia, liczba bitów
+_MAGIC = b"QRS1"
+BITS_PER_QUESTION = 16  # Zapas ogranicza kolizje skrótów w bitmapie
+MIN_BITS = 4096
+
+
+def question_hash(question: str) -> int:
+    """Stabilny (niezależny od procesu) 64-bitowy skrót treści pytania"""
+    return int.from_bytes(
+        hashlib.blake2b(question.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def get_rotation_path(questions_file: str) -> str:
+    """Zwraca ścieżkę pliku rotacji leżącego obok banku pytań"""
+    return questions_file + ROTATION_SUFFIX
+
+
+class QuestionRotation:
+    """Bitmapa zadanych pytań indeksowana skrótem treści pytania"""
+
+    def __init__(self, path: str, bank_size: int):
+        self.path = path
+        bits = MIN_BITS
+        while bits < bank_size * BITS_PER_QUESTION:
+            bits *= 2
+        self.bits = bits
+        self.bitmap = bytearray(bits // 8)
+        self.dirty = False
+        self._was_reset = False
+        self._lock = threading.Lock()
+        self._load()
+
+    def _read_bitmap(self) -> Optional[bytes]:
+        """Czyta bitmapę z dysku, jeśli pasuje do rozmiaru banku"""
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) != _HEADER.size + self.bits // 8:
+            return None
+        magic, bits = _HEADER.unpack_from(data)
+        if magic != _MAGIC or bits != self.bits:
+            return None
+        return data[_HEADER.size:]
+
+    def _load(self):
+        data = self._read_bitmap()
+        if data is not None:
+            self.bitmap[:] = data
+
+    def _position(self, qhash: int) -> int:
+        return qhash & (self.bits - 1)
+
+    def is_seen(self, qhash: int) -> bool:
+        """Sprawdza czy pytanie o danym skrócie było już zadane"""
+        position = self._position(qhash)
+        return bool(self.bitmap[position >> 3] & (1 << (position & 7)))
+
+    def mark_seen(self, qhash: int):
+        """Oznacza pytanie jako zadane (tylko w pamięci, zapis przez save)"""
+        position = self._position(qhash)
+        with self._lock:
+            self.bitmap[position >> 3] |= 1 << (position & 7)
+            self.dirty = True
+
+    def reset(self):
+        """Czyści zapis po wyczerpaniu banku"""
+        with self._lock:
+            self.bitmap[:] = bytes(len(self.bitmap))
+            self.dirty = True
+            self._was_reset = True
+        logger.info(f"Wyczerpano bank pytań, reset rotacji: {self.path}")
+
+    def save(self):
+        """Zapisuje bitmapę, łącząc ją z zapisem innych gier z tego samego banku"""
+        with self._lock:
+            if not self.dirty:
+                return
+            if not self._was_reset:
+                on_disk = self._read_bitmap()
+                if on_disk is not None:
+                    merged = int.from_bytes(self.bitmap, "little") | int.from_bytes(on_disk, "little")
+                    self.bitmap[:] = merged.to_bytes(len(self.bitmap), "little")
+            tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, "wb") as f:
+                    f.write(_HEADER.pack(_MAGIC, self.bits))
+                    f.write(self.bitmap)
+                os.replace(tmp_path, self.path)
+                self.dirty = False
+                self._was_reset = False
+            except Exception as e:
+                logger.error(f"Błąd zapisu rotacji pytań: {e}")
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
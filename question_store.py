@@ -0,0 +1,263 @@
+"""
+Moduł bazy pytań SQLite - indeksowane przechowywanie dużych banków pytań
+z kategoriami, poziomem trudności i językiem
+"""
+
+import os
+import random
+import sqlite3
+from contextlib import closing
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import logging
+
+from answer_matching import parse_aliases
+
+logger = logging.getLogger(__name__)
+
+# Nazwy nagłówków w arkuszu -> kolumna w bazie
+HEADER_ALIASES = {
+    "pytanie": "question",
+    "question": "question",
+    "odpowiedź": "answer",
+    "odpowiedz": "answer",
+    "answer": "answer",
+    "kategoria": "category",
+    "category": "category",
+    "trudność": "difficulty",
+    "trudnosc": "difficulty",
+    "difficulty": "difficulty",
+    "język": "language",
+    "jezyk": "language",
+    "language": "language",
+    "aliasy": "aliases",
+    "aliases": "aliases",
+    "alias": "aliases",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    id INTEGER PRIMARY KEY,
+    question TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    category TEXT,
+    difficulty INTEGER,
+    language TEXT,
+    aliases TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_questions_filter ON questions (category, difficulty, language);
+CREATE INDEX IF NOT EXISTS idx_questions_difficulty ON questions (difficulty);
+CREATE INDEX IF NOT EXISTS idx_questions_language ON questions (language);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Losowanie w dużej bazie: identyfikatory losowane z zakresu i sprawdzane po kluczu głównym,
+# bez czytania wszystkich pasujących do Pythona; małe bazy i rzadkie filtry czytają indeks
+SAMPLE_SCAN_LIMIT = 10000  # Do tylu wierszy identyfikatory czytamy od razu z indeksu
+MAX_PROBES_PER_HIT = 20  # Limit prób na jedno pytanie - rzadszy filtr przechodzi na indeks
+PROBE_BATCH = 500  # Identyfikatorów w jednym zapytaniu (limit parametrów SQLite)
+
+
+def _normalize_tag(value: Any) -> Optional[str]:
+    """Normalizuje kategorię/język do porównań w indeksie"""
+    if value is None:
+        return None
+    text = str(value).strip().lower()
+    return text or None
+
+
+def _normalize_difficulty(value: Any) -> Optional[Any]:
+    """Zamienia trudność na liczbę, jeśli to możliwe"""
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return _normalize_tag(value)
+
+
+class QuestionStore:
+    """Indeksowany bank pytań w bazie SQLite"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(questions)")}
+            if "aliases" not in columns:
+                # Baza sprzed kolumny aliasów - dodaj ją i wymuś ponowny import
+                with conn:
+                    conn.execute("ALTER TABLE questions ADD COLUMN aliases TEXT")
+                    conn.execute("DELETE FROM meta WHERE key = 'source'")
+
+    @staticmethod
+    def path_for_workbook(questions_file: str) -> str:
+        """Zwraca ścieżkę bazy leżącej obok skoroszytu"""
+        return os.path.splitext(questions_file)[0] + ".db"
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path)
+
+    def _get_meta(self, conn: sqlite3.Connection, key: str) -> Optional[str]:
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def is_up_to_date(self, questions_file: str) -> bool:
+        """Sprawdza czy baza odpowiada aktualnej wersji skoroszytu"""
+        stat = os.stat(questions_file)
+        with closing(self._connect()) as conn:
+            return self._get_meta(conn, "source") == f"{stat.st_mtime_ns}:{stat.st_size}"
+
+    def _iter_workbook_rows(self, questions_file: str) -> Iterator[Tuple[Any, ...]]:
+        """Czyta wiersze skoroszytu, rozpoznając kolumny po nagłówkach"""
+        import openpyxl  # Tylko przy imporcie - baza aktualna nie wymaga parsowania skoroszytu
+        workbook = openpyxl.load_workbook(questions_file, read_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, ())
+            columns = {}
+            for position, name in enumerate(header):
+                key = HEADER_ALIASES.get(str(name).strip().lower()) if name else None
+                if key and key not in columns:
+                    columns[key] = position
+            # Bez rozpoznanych nagłówków - pytanie i odpowiedź w dwóch pierwszych kolumnach
+            columns.setdefault("question", 0)
+            columns.setdefault("answer", 1)
+
+            def cell(row, key):
+                position = columns.get(key)
+                if position is None or position >= len(row):
+                    return None
+                return row[position]
+
+            for row in rows:
+                question = cell(row, "question")
+                answer = cell(row, "answer")
+                if not question or not answer:
+                    continue
+                yield (
+                    str(question).strip(),
+                    str(answer).strip().lower(),
+                    _normalize_tag(cell(row, "category")),
+                    _normalize_difficulty(cell(row, "difficulty")),
+                    _normalize_tag(cell(row, "language")),
+                    "|".join(parse_aliases(cell(row, "aliases"))) or None,
+                )
+        finally:
+            workbook.close()
+
+    def import_workbook(self, questions_file: str) -> int:
+        """Importuje pytania ze skoroszytu, zastępując poprzednią zawartość"""
+        stat = os.stat(questions_file)
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.execute("DELETE FROM questions")
+                conn.executemany(
+                    "INSERT INTO questions (question, answer, category, difficulty, language, aliases) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    self._iter_workbook_rows(questions_file)
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('source', ?)",
+                    (f"{stat.st_mtime_ns}:{stat.st_size}",)
+                )
+            count = conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0]
+        logger.info(f"Zaimportowano {count} pytań do {self.db_path}")
+        return count
+
+    def import_if_changed(self, questions_file: str) -> bool:
+        """Importuje skoroszyt tylko wtedy, gdy zmienił się od ostatniego importu"""
+        if self.is_up_to_date(questions_file):
+            return False
+        self.import_workbook(questions_file)
+        return True
+
+    @staticmethod
+    def _build_filter(filters: Dict[str, Any]) -> Tuple[List[str], List[Any]]:
+        clauses = []
+        params: List[Any] = []
+        if filters.get("category") is not None:
+            clauses.append("category = ?")
+            params.append(_normalize_tag(filters["category"]))
+        if filters.get("difficulty") is not None:
+            clauses.append("difficulty = ?")
+            params.append(_normalize_difficulty(filters["difficulty"]))
+        if filters.get("language") is not None:
+            clauses.append("language = ?")
+            params.append(_normalize_tag(filters["language"]))
+        return clauses, params
+
+    def count(self, category: Optional[str] = None, difficulty: Optional[Any] = None,
+              language: Optional[str] = None) -> int:
+        """Zwraca liczbę pytań spełniających filtr"""
+        clauses, params = self._build_filter(
+            {"category": category, "difficulty": difficulty, "language": language})
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        with closing(self._connect()) as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM questions{where}", params).fetchone()[0]
+
+    def sample(self, count: int, category: Optional[str] = None,
+               difficulty: Optional[Any] = None,
+               language: Optional[str] = None) -> List[Tuple[str, str, Tuple[str, ...]]]:
+        """Losuje count pytań spełniających filtr (pusta lista, gdy żadne nie pasuje)"""
+        clauses, params = self._build_filter(
+            {"category": category, "difficulty": difficulty, "language": language})
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        with closing(self._connect()) as conn:
+            # Osobne podzapytania - MIN i MAX razem SQLite liczy skanując całą tabelę
+            low, high = conn.execute(
+                "SELECT (SELECT MIN(id) FROM questions), (SELECT MAX(id) FROM questions)").fetchone()
+            if low is None or count <= 0:
+                return []
+            chosen = None
+            if high - low + 1 > SAMPLE_SCAN_LIMIT:
+                chosen = self._probe_ids(conn, clauses, params, low, high, count)
+            if chosen is None:
+                # Same identyfikatory czytane są z indeksu, treść tylko dla wylosowanych
+                ids = [row[0] for row in conn.execute(f"SELECT id FROM questions{where}", params)]
+                chosen = random.sample(ids, min(count, len(ids)))
+            if not chosen:
+                return []
+            placeholders = ",".join("?" * len(chosen))
+            rows = {
+                row[0]: (row[1], row[2], tuple(row[3].split("|")) if row[3] else ())
+                for row in conn.execute(
+                    f"SELECT id, question, answer, aliases FROM questions WHERE id IN ({placeholders})",
+                    chosen
+                )
+            }
+        return [rows[question_id] for question_id in chosen]
+
+    @staticmethod
+    def _probe_ids(conn: sqlite3.Connection, clauses: List[str], params: List[Any],
+                   low: int, high: int, count: int) -> Optional[List[int]]:
+        """Losuje identyfikatory z zakresu [low, high] i zostawia te, które spełniają filtr
+        (każde pasujące pytanie ma tę samą szansę); None, gdy filtr jest zbyt rzadki"""
+        # "+kolumna" wyłącza indeks filtra - wiersze mają być szukane tylko po kluczu głównym
+        condition = "".join(f" AND +{clause}" for clause in clauses)
+        budget = min(count * MAX_PROBES_PER_HIT, high - low + 1)
+        tried = set()
+        chosen: List[int] = []
+        while len(chosen) < count:
+            if len(tried) >= budget:
+                return None
+            batch = []
+            while len(batch) < PROBE_BATCH and len(tried) < budget:
+                candidate = random.randint(low, high)
+                if candidate not in tried:
+                    tried.add(candidate)
+                    batch.append(candidate)
+            placeholders = ",".join("?" * len(batch))
+            hits = {row[0] for row in conn.execute(
+                f"SELECT id FROM questions WHERE id IN ({placeholders}){condition}", batch + params)}
+            # Kolejność losowania, a nie kolejność klucza
+            chosen.extend(candidate for candidate in batch if candidate in hits)
+        return chosen[:count]
+
+    def get_categories(self) -> List[str]:
+        """Zwraca listę dostępnych kategorii"""
+        with closing(self._connect()) as conn:
+            return [row[0] for row in conn.execute(
+                "SELECT DISTINCT category FROM questions WHERE category IS NOT NULL ORDER BY category")]
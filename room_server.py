@@ -0,0 +1,187 @@
+"""
+Moduł serwera wielu stołów - rejestr pokoi (kod pokoju -> GameLogic i gracze),
+kierowanie dołączających do pokoju po kodzie oraz podział pokoi między procesy
+nasłuchujące na wspólnym porcie
+"""
+
+import asyncio
+import json
+import secrets
+from typing import Callable, Dict, List, Optional, Sequence
+import logging
+
+import websockets
+
+from message_frame import decode_message
+from network_manager import MSG_REDIRECT, NetworkManager
+
+logger = logging.getLogger(__name__)
+
+# Bez znaków łatwych do pomylenia (0/O, 1/I)
+ROOM_ALPHABET = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"
+ROOM_CODE_LENGTH = 4
+JOIN_TIMEOUT = 10.0  # Czas na wysłanie żądania dołączenia po połączeniu (s)
+
+
+def room_worker(code: str, workers: int) -> Optional[int]:
+    """Numer procesu, który obsługuje pokój (zapisany w pierwszym znaku kodu)"""
+    if len(code) != ROOM_CODE_LENGTH or code[0] not in ROOM_ALPHABET:
+        return None
+    return ROOM_ALPHABET.index(code[0]) % workers
+
+
+class Room:
+    """Jedna gra na serwerze wielu stołów"""
+
+    __slots__ = ("code", "network", "game", "task")
+
+    def __init__(self, code: str, network: NetworkManager, game, task: Optional[asyncio.Task] = None):
+        self.code = code
+        self.network = network
+        self.game = game
+        self.task = task  # Zadanie prowadzące grę w pokoju
+
+    def player_count(self) -> int:
+        return len(self.network.players)
+
+
+RoomFactory = Callable[[str], Room]
+
+
+class RoomRegistry:
+    """Pokoje obsługiwane przez jeden proces serwera"""
+
+    def __init__(self, room_factory: RoomFactory, worker_index: int = 0, workers: int = 1,
+                 max_rooms: int = 200):
+        self.room_factory = room_factory  # Tworzy pokój (NetworkManager, GameLogic, zadanie gry)
+        self.worker_index = worker_index
+        self.workers = workers
+        self.max_rooms = max_rooms
+        self.rooms: Dict[str, Room] = {}
+        # Pierwsze znaki kodów należące do tego procesu
+        self._first_letters = [letter for position, letter in enumerate(ROOM_ALPHABET)
+                               if position % workers == worker_index]
+
+    def __len__(self) -> int:
+        return len(self.rooms)
+
+    def __contains__(self, code: str) -> bool:
+        return code in self.rooms
+
+    def new_code(self) -> str:
+        """Losuje wolny kod pokoju obsługiwanego przez ten proces"""
+        while True:
+            code = secrets.choice(self._first_letters) + "".join(
+                secrets.choice(ROOM_ALPHABET) for _ in range(ROOM_CODE_LENGTH - 1))
+            if code not in self.rooms:
+                return code
+
+    def create(self, code: Optional[str] = None) -> Optional[Room]:
+        """Zakłada pokój (None, gdy osiągnięto limit pokoi)"""
+        if len(self.rooms) >= self.max_rooms:
+            return None
+        code = code or self.new_code()
+        room = self.room_factory(code)
+        self.rooms[code] = room
+        # Gracz rozłączony w trakcie gry zwalnia miejsce dopiero po czasie na powrót
+        room.network.on_message('player_left', lambda message: self.remove_if_empty(room))
+        logger.info(f"Utworzono pokój {code} (pokoi w procesie: {len(self.rooms)})")
+        return room
+
+    def remove_if_empty(self, room: Room):
+        """Usuwa pokój, z którego wyszli wszyscy gracze"""
+        if room.player_count() == 0 and self.rooms.get(room.code) is room:
+            self.remove(room.code)
+
+    def get(self, code: str) -> Optional[Room]:
+        return self.rooms.get(code)
+
+    def remove(self, code: str):
+        """Usuwa pokój i zatrzymuje jego grę"""
+        room = self.rooms.pop(code, None)
+        if room is None:
+            return
+        if room.task is not None:
+            room.task.cancel()
+        if room.game.journal is not None:
+            room.game.journal.close()
+        logger.info(f"Usunięto pokój {code}")
+
+    def codes(self) -> List[str]:
+        return list(self.rooms)
+
+
+class RoomServer:
+    """Serwer WebSocket kierujący graczy do pokoi po kodzie z żądania dołączenia"""
+
+    def __init__(self, registry: RoomRegistry, port: int = 8765,
+                 worker_ports: Optional[Sequence[int]] = None):
+        self.registry = registry
+        self.port = port
+        # Prywatne porty procesów - tam trafiają przekierowani gracze
+        self.worker_ports = list(worker_ports or ())
+        self.servers = []
+
+    async def start(self):
+        """Nasłuchuje na wspólnym porcie (i na prywatnym porcie procesu przy wielu procesach)"""
+        shared = self.registry.workers > 1
+        self.servers.append(await websockets.serve(
+            self.route_connection, "0.0.0.0", self.port,
+            compression=None, reuse_port=shared or None
+        ))
+        if shared:
+            private_port = self.worker_ports[self.registry.worker_index]
+            self.servers.append(await websockets.serve(
+                self.route_connection, "0.0.0.0", private_port, compression=None
+            ))
+        logger.info(f"Serwer pokoi (proces {self.registry.worker_index}) nasłuchuje na porcie {self.port}")
+
+    async def close(self):
+        for server in self.servers:
+            server.close()
+            await server.wait_closed()
+        for code in self.registry.codes():
+            self.registry.remove(code)
+
+    async def _reject(self, websocket, message: str):
+        await websocket.send(json.dumps({'type': 'error', 'message': message}))
+
+    async def route_connection(self, websocket, path=None):
+        """Odczytuje żądanie dołączenia i przekazuje połączenie do obsługi pokoju"""
+        try:
+            first_message = await asyncio.wait_for(websocket.recv(), JOIN_TIMEOUT)
+            data = decode_message(first_message)
+        except Exception as e:
+            logger.info(f"Połączenie bez żądania dołączenia: {e}")
+            return
+        if data.get('type') != 'join':
+            await self._reject(websocket, 'Najpierw dołącz do pokoju!')
+            return
+
+        registry = self.registry
+        if data.get('create_room'):
+            room = registry.create()
+            if room is None:
+                await self._reject(websocket, 'Brak wolnych stołów!')
+                return
+        else:
+            code = str(data.get('room') or '').strip().upper()
+            owner = room_worker(code, registry.workers)
+            if owner is None:
+                await self._reject(websocket, 'Podaj poprawny kod pokoju!')
+                return
+            if owner != registry.worker_index:
+                # Pokój jest w innym procesie - klient połączy się z jego portem
+                await websocket.send(json.dumps({
+                    'type': MSG_REDIRECT,
+                    'port': self.worker_ports[owner],
+                    'room': code
+                }))
+                return
+            room = registry.get(code)
+            if room is None:
+                await self._reject(websocket, 'Nie ma pokoju o tym kodzie!')
+                return
+
+        await room.network.handle_client_connection(websocket, first_message=first_message)
+        registry.remove_if_empty(room)
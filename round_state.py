@@ -0,0 +1,189 @@
+"""
+Moduł stanu rundy - zwarta reprezentacja graczy, odpowiedzi, głosów i wyników
+oparta na numerach graczy i tablicach, dla gier z setkami uczestników
+"""
+
+import sys
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional
+
+NO_ANSWER = -1  # Brak odpowiedzi/głosu w kolumnie
+
+
+class PlayerTable:
+    """Internuje nazwy graczy do kolejnych numerów"""
+
+    __slots__ = ("names", "ids")
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.ids: Dict[str, int] = {}
+
+    def intern(self, name: str) -> int:
+        """Zwraca numer gracza, nadając go przy pierwszym użyciu"""
+        player_id = self.ids.get(name)
+        if player_id is None:
+            player_id = len(self.names)
+            name = sys.intern(name)
+            self.names.append(name)
+            self.ids[name] = player_id
+        return player_id
+
+    def get(self, name: str) -> Optional[int]:
+        return self.ids.get(name)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+class AnswerGroup:
+    """Gracze, którzy udzielili tej samej odpowiedzi"""
+
+    __slots__ = ("text", "players", "is_correct")
+
+    def __init__(self, text: str, is_correct: bool):
+        self.text = text
+        self.players: Dict[int, None] = {}  # numer gracza -> None (zachowuje kolejność)
+        self.is_correct = is_correct
+
+
+class ScoreTable:
+    """Wyniki graczy w tablicy indeksowanej numerem gracza"""
+
+    __slots__ = ("scores", "present", "order")
+
+    def __init__(self):
+        self.scores = array('q')
+        self.present = bytearray()  # 1 = gracz ma wpis w tabeli wyników
+        self.order = array('i')  # Kolejność dodania graczy do tabeli
+
+    def ensure(self, player_id: int):
+        """Dodaje gracza do tabeli z wynikiem 0, jeśli go w niej nie ma"""
+        missing = player_id + 1 - len(self.scores)
+        if missing > 0:
+            self.scores.extend(array('q', [0]) * missing)
+            self.present.extend(bytes(missing))
+        if not self.present[player_id]:
+            self.present[player_id] = 1
+            self.order.append(player_id)
+
+    def add(self, player_id: int, points: int):
+        self.ensure(player_id)
+        self.scores[player_id] += points
+
+    def has(self, player_id: Optional[int]) -> bool:
+        return player_id is not None and player_id < len(self.present) and bool(self.present[player_id])
+
+    def reset(self):
+        """Czyści tabelę bez zwalniania tablic"""
+        for player_id in self.order:
+            self.scores[player_id] = 0
+            self.present[player_id] = 0
+        del self.order[:]
+
+
+class RoundState:
+    """Odpowiedzi i głosy jednej rundy w kolumnach indeksowanych numerem gracza"""
+
+    __slots__ = ("answer_of", "vote_of", "answered", "voted", "texts", "text_ids",
+                 "groups", "eligible", "eligible_ready")
+
+    def __init__(self):
+        self.answer_of = array('i')  # numer gracza -> numer tekstu odpowiedzi
+        self.vote_of = array('i')  # numer gracza -> numer tekstu, na który głosuje
+        self.answered = array('i')  # Gracze w kolejności pierwszej odpowiedzi
+        self.voted = array('i')  # Gracze w kolejności pierwszego głosu
+        self.texts: List[str] = []  # numer tekstu -> tekst
+        self.text_ids: Dict[str, int] = {}
+        self.groups: List[Optional[AnswerGroup]] = []  # numer tekstu -> grupa (lub None)
+        self.eligible = bytearray()  # 1 = gracz może głosować
+        self.eligible_ready = False
+
+    def grow(self, player_count: int):
+        """Poszerza kolumny do liczby znanych graczy"""
+        missing = player_count - len(self.answer_of)
+        if missing > 0:
+            filler = array('i', [NO_ANSWER]) * missing
+            self.answer_of.extend(filler)
+            self.vote_of.extend(filler)
+            self.eligible.extend(bytes(missing))
+
+    def text_id(self, text: str) -> int:
+        """Zwraca numer tekstu odpowiedzi w tej rundzie"""
+        text_id = self.text_ids.get(text)
+        if text_id is None:
+            text_id = len(self.texts)
+            self.texts.append(text)
+            self.text_ids[text] = text_id
+            self.groups.append(None)
+        return text_id
+
+    def clear(self):
+        """Czyści rundę, zerując tylko zajęte komórki"""
+        for player_id in self.answered:
+            self.answer_of[player_id] = NO_ANSWER
+            self.eligible[player_id] = 0
+        for player_id in self.voted:
+            self.vote_of[player_id] = NO_ANSWER
+            self.eligible[player_id] = 0
+        del self.answered[:]
+        del self.voted[:]
+        self.texts.clear()
+        self.text_ids.clear()
+        self.groups.clear()
+        self.eligible_ready = False
+
+
+class ScoresView(Mapping):
+    """Widok tylko do odczytu: gracz -> wynik"""
+
+    __slots__ = ("_players", "_table")
+
+    def __init__(self, players: PlayerTable, table: ScoreTable):
+        self._players = players
+        self._table = table
+
+    def __getitem__(self, name: str) -> int:
+        player_id = self._players.get(name)
+        if not self._table.has(player_id):
+            raise KeyError(name)
+        return self._table.scores[player_id]
+
+    def __iter__(self) -> Iterator[str]:
+        names = self._players.names
+        return (names[player_id] for player_id in self._table.order)
+
+    def __len__(self) -> int:
+        return len(self._table.order)
+
+
+class RoundColumnView(Mapping):
+    """Widok tylko do odczytu: gracz -> odpowiedź (lub głos) w bieżącej rundzie"""
+
+    __slots__ = ("_players", "_round", "_votes")
+
+    def __init__(self, players: PlayerTable, round_state: RoundState, votes: bool = False):
+        self._players = players
+        self._round = round_state
+        self._votes = votes
+
+    def _column(self) -> array:
+        return self._round.vote_of if self._votes else self._round.answer_of
+
+    def _order(self) -> array:
+        return self._round.voted if self._votes else self._round.answered
+
+    def __getitem__(self, name: str) -> str:
+        player_id = self._players.get(name)
+        column = self._column()
+        if player_id is None or player_id >= len(column) or column[player_id] == NO_ANSWER:
+            raise KeyError(name)
+        return self._round.texts[column[player_id]]
+
+    def __iter__(self) -> Iterator[str]:
+        names = self._players.names
+        return (names[player_id] for player_id in self._order())
+
+    def __len__(self) -> int:
+        return len(self._order())
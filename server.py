@@ -0,0 +1,400 @@
+"""
+Serwer dedykowany bez interfejsu - uruchamia NetworkManager i GameLogic jako zwykły
+proces asyncio (bez Kivy), np. na małym komputerze w lokalu; wszyscy gracze dołączają z telefonów.
+W trybie wielu stołów (rooms = yes) prowadzi wiele gier naraz, opcjonalnie w kilku procesach
+
+Użycie: python server.py [--config server.ini] [--port 8765]
+"""
+
+import argparse
+import asyncio
+import configparser
+import logging
+import multiprocessing
+import os
+import signal
+from typing import Any, Callable, Dict, List, Optional
+
+from game_logic import GameLogic
+from network_manager import MSG_LINK_STATS, MSG_PLAYER_AWAY, MSG_PLAYER_BACK, NetworkManager
+from room_server import Room, RoomRegistry, RoomServer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG = {
+    'server': {
+        'port': '8765',
+        'send_queue_size': '256',
+        'slow_client_policy': 'drop_oldest',
+        'coalesce_interval': '0.04',
+        'resume_grace': '60',
+        'replay_buffer_size': '256',
+        'heartbeat_interval': '2',
+        'lag_threshold': '0.3',
+        'rooms': 'no',
+        'max_rooms': '200',
+        'workers': '1',
+        'worker_base_port': '',
+    },
+    'game': {
+        'questions_file': 'questions.xlsx',
+        'question_count': '25',
+        'use_store': 'no',
+        'rotate_questions': 'yes',
+        'journal': '',
+        'min_players': '2',
+        'start_delay': '10',
+        'answer_time': '30',
+        'vote_time': '20',
+        'results_time': '5',
+    },
+}
+
+
+def load_config(path: Optional[str]) -> configparser.ConfigParser:
+    """Wczytuje konfigurację (brakujące wartości biorą się z DEFAULT_CONFIG)"""
+    config = configparser.ConfigParser()
+    config.read_dict(DEFAULT_CONFIG)
+    if path:
+        if not config.read(path, encoding='utf-8'):
+            logger.warning(f"Brak pliku konfiguracji {path} - używam ustawień domyślnych")
+    return config
+
+
+class HeadlessGame:
+    """Prowadzi grę na serwerze: pytania, głosowanie i wyniki sterowane czasem i wiadomościami"""
+
+    def __init__(self, network: NetworkManager, game: GameLogic, min_players: int = 2,
+                 start_delay: float = 10.0, answer_time: float = 30.0, vote_time: float = 20.0,
+                 results_time: float = 5.0):
+        self.network = network
+        self.game = game
+        self.min_players = min_players
+        self.start_delay = start_delay  # Czas od zebrania graczy do startu (s)
+        self.answer_time = answer_time
+        self.vote_time = vote_time
+        self.results_time = results_time
+        self.voters = []  # Gracze rundy w chwili zamknięcia odpowiedzi
+        self.laggy_players = set()
+        self._changed = asyncio.Event()  # Budzi pętlę gry po każdej wiadomości
+
+        network.on_message('answer', self.on_answer)
+        network.on_message('vote', self.on_vote)
+        network.on_message('player_joined', self.on_players_changed)
+        network.on_message('player_left', self.on_player_left)
+        network.on_message(MSG_PLAYER_AWAY, self.on_player_away)
+        network.on_message(MSG_PLAYER_BACK, self.on_player_back)
+        network.on_message(MSG_LINK_STATS, self.on_link_stats)
+
+    def on_answer(self, message: Dict[str, Any]):
+        game = self.game
+        game.add_player_answer(message['player_name'], str(message.get('answer', '')))
+        if game.game_phase == "answering":
+            self._report_progress(len(game.current_answers), len(self._players()))
+        self._changed.set()
+
+    def on_vote(self, message: Dict[str, Any]):
+        game = self.game
+        game.add_vote(message['player_name'], str(message.get('vote', '')))
+        if game.game_phase == "voting":
+            done = len(game.current_votes)
+            self._report_progress(done, done + max(game.votes_outstanding, 0), voting=True)
+        self._changed.set()
+
+    def _report_progress(self, done: int, total: int, voting: bool = False):
+        """Rozsyła postęp - przy wielu odpowiedziach naraz okno łączenia wysyła tylko ostatni stan"""
+        asyncio.get_running_loop().create_task(self.network.broadcast_answer_count(done, total, voting))
+
+    def on_players_changed(self, message: Dict[str, Any]):
+        self._changed.set()
+
+    def on_player_left(self, message: Dict[str, Any]):
+        self.game.remove_player(message['player_name'])
+        self._changed.set()
+
+    def on_player_away(self, message: Dict[str, Any]):
+        # Runda nie czeka na gracza, który stracił połączenie (miejsce w grze zostaje)
+        self.game.set_player_away(message['player_name'])
+        self._changed.set()
+
+    def on_player_back(self, message: Dict[str, Any]):
+        self.game.set_player_away(message['player_name'], False)
+        self._changed.set()
+
+    def on_link_stats(self, message: Dict[str, Any]):
+        self.game.update_link_stats(message['players'])
+        laggy = {name for name, stats in message['players'].items() if stats['laggy']}
+        for name in laggy - self.laggy_players:
+            stats = message['players'][name]
+            logger.warning(f"Gracz {name} ma słabe łącze (RTT {stats['rtt'] * 1000:.0f} ms, "
+                           f"utracone pingi: {stats['lost']})")
+        self.laggy_players = laggy
+
+    async def _wait_until(self, condition: Callable[[], bool], timeout: Optional[float] = None):
+        """Czeka na spełnienie warunku (sprawdzanego po każdej wiadomości) albo na upływ czasu"""
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while not condition():
+            remaining = None if deadline is None else deadline - loop.time()
+            if remaining is not None and remaining <= 0:
+                return
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                return
+
+    def _players(self):
+        return self.network.get_players_list()
+
+    async def _send_scoreboards(self, message: Dict[str, Any],
+                                round_scores: Optional[Dict[str, int]] = None):
+        """Każdy gracz dostaje tylko czołówkę i swoje sąsiedztwo w rankingu, nie całą tabelę"""
+        for player_name in self._players():
+            personal = dict(message, scoreboard=self.game.get_scoreboard_for(player_name))
+            if round_scores is not None:
+                personal['points'] = round_scores.get(player_name, 0)
+            await self.network.send_to_client(player_name, personal)
+
+    async def _push_snapshot(self):
+        """Przekazuje stan gry zapasowemu hostowi na granicy fazy"""
+        try:
+            await self.network.push_snapshot(self.game.create_snapshot())
+        except Exception as e:
+            logger.error(f"Błąd wysyłania zrzutu gry: {e}")
+
+    async def run(self):
+        """Rozgrywa kolejne gry, gdy zbierze się wystarczająco graczy"""
+        # Gra odtworzona z dziennika po awarii jest dokańczana, zanim zacznie się nowa
+        resume = self.game.game_phase != "waiting" and not self.game.is_game_finished()
+        while True:
+            logger.info(f"Czekam na graczy (minimum {self.min_players})")
+            await self._wait_until(lambda: len(self._players()) >= self.min_players)
+            await asyncio.sleep(self.start_delay)
+            if len(self._players()) < self.min_players:
+                continue
+            await self.play_game(resume)
+            resume = False
+
+    async def play_game(self, resume: bool = False):
+        """Rozgrywa grę; resume = dokończ grę od bieżącej fazy (np. po odtworzeniu dziennika)"""
+        network = self.network
+        game = self.game
+        if resume:
+            logger.info(f"Wznawiam grę od pytania {game.current_question_index + 1} (faza: {game.game_phase})")
+        else:
+            # Każda gra losuje nowe pytania (z rotacją - najpierw jeszcze nie zadane)
+            game.reset_game()
+            game.start_new_game()
+            await self._push_snapshot()
+        total = len(game.question_order)
+        while not game.is_game_finished():
+            question = game.get_current_question()
+            if game.game_phase == "answering":
+                await network.sync_round(game.current_question_index)
+                await network.broadcast_to_clients({
+                    'type': 'question',
+                    'question': question,
+                    'number': game.current_question_index + 1,
+                    'total': total,
+                    'time': self.answer_time
+                })
+                # Termin wydłużony o czas odpowiedzi najwolniejszego łącza
+                answer_time = self.answer_time + game.latency_allowance(self._players())
+                await self._wait_until(lambda: game.are_all_answers_submitted(self._players()), answer_time)
+
+                self.voters = self._players()
+                game.start_voting(self.voters)
+                await self._push_snapshot()
+            else:
+                self.voters = self._players()  # Runda odtworzona z dziennika
+
+            if game.game_phase == "voting":
+                # Grupy trafiają do stanu dopiero po zamknięciu odpowiedzi - wcześniej zdradzałyby
+                # cudze odpowiedzi; wracający klienci dostają je z różnic albo z pełnego stanu
+                await network.sync_answer_groups(game.pop_grouping_changes())
+                await network.broadcast_to_clients({
+                    'type': 'voting',
+                    'answers': game.get_grouped_answers(),
+                    'time': self.vote_time
+                })
+                vote_time = self.vote_time + game.latency_allowance(self.voters)
+                await self._wait_until(lambda: game.are_all_votes_submitted(self.voters), vote_time)
+
+                round_scores = game.calculate_round_scores(self.voters)
+                await self._push_snapshot()
+                # Wyniki nie idą strumieniem różnic - po rundzie zmienia się prawie cała tabela
+                await self._send_scoreboards({
+                    'type': 'round_results',
+                    'correct_answer': game.get_correct_answer()
+                }, round_scores)
+                await asyncio.sleep(self.results_time)
+            game.next_question()
+            await self._push_snapshot()
+
+        await self._send_scoreboards({'type': 'game_over'})
+        # Pełna tabela zostaje na serwerze
+        logger.info(f"Gra zakończona, wyniki: {game.get_final_scores()}")
+
+
+def create_network(config: configparser.ConfigParser, room_code: Optional[str] = None) -> NetworkManager:
+    """NetworkManager hosta z ustawieniami z sekcji [server]"""
+    server_config = config['server']
+    network = NetworkManager(
+        is_host=True,
+        port=server_config.getint('port'),
+        send_queue_size=server_config.getint('send_queue_size'),
+        slow_client_policy=server_config.get('slow_client_policy'),
+        coalesce_interval=server_config.getfloat('coalesce_interval') or None,
+        room_code=room_code,
+        replay_buffer_size=server_config.getint('replay_buffer_size'),
+        resume_grace=server_config.getfloat('resume_grace'),
+        heartbeat_interval=server_config.getfloat('heartbeat_interval') or None,
+        lag_threshold=server_config.getfloat('lag_threshold')
+    )
+    # Wiadomości obsługujemy w tej samej pętli - jedno wywołanie na paczkę
+    network.set_scheduler(asyncio.get_running_loop().call_soon)
+    return network
+
+
+def create_game(config: configparser.ConfigParser, network: NetworkManager,
+                journal_suffix: str = "") -> HeadlessGame:
+    """GameLogic i prowadząca ją HeadlessGame z ustawieniami z sekcji [game]"""
+    game_config = config['game']
+    game = GameLogic(
+        game_config.get('questions_file'),
+        question_count=game_config.getint('question_count'),
+        use_store=game_config.getboolean('use_store'),
+        rotate_questions=game_config.getboolean('rotate_questions')
+    )
+    if game_config.get('journal'):
+        journal_path = game_config.get('journal') + journal_suffix
+        if os.path.exists(journal_path):
+            # Odtwórz grę przerwaną awarią, zanim nowa gra wyczyści dziennik
+            game.replay_journal(journal_path)
+        game.attach_journal(journal_path)
+
+    return HeadlessGame(
+        network, game,
+        min_players=game_config.getint('min_players'),
+        start_delay=game_config.getfloat('start_delay'),
+        answer_time=game_config.getfloat('answer_time'),
+        vote_time=game_config.getfloat('vote_time'),
+        results_time=game_config.getfloat('results_time')
+    )
+
+
+async def wait_for_stop():
+    """Czeka na SIGINT/SIGTERM"""
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signal_number, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows - zatrzymanie przez KeyboardInterrupt
+    await stop.wait()
+
+
+async def run_server(config: configparser.ConfigParser):
+    """Uruchamia serwer i grę w bieżącej pętli zdarzeń do czasu zatrzymania"""
+    network = create_network(config)
+    headless = create_game(config, network)
+
+    server_task = asyncio.create_task(network.start_server())
+    game_task = asyncio.create_task(headless.run())
+    await wait_for_stop()
+
+    logger.info("Zatrzymywanie serwera")
+    game_task.cancel()
+    await network.close()
+    await asyncio.gather(server_task, game_task, return_exceptions=True)
+    if headless.game.journal is not None:
+        headless.game.journal.close()
+
+
+def worker_ports(config: configparser.ConfigParser) -> List[int]:
+    """Prywatne porty procesów (domyślnie kolejne po porcie wspólnym)"""
+    server_config = config['server']
+    base_port = server_config.get('worker_base_port') or server_config.getint('port') + 1
+    return [int(base_port) + index for index in range(server_config.getint('workers'))]
+
+
+async def run_room_server(config: configparser.ConfigParser, worker_index: int = 0):
+    """Uruchamia serwer wielu stołów (jeden proces) do czasu zatrzymania"""
+    server_config = config['server']
+
+    def create_room(code: str) -> Room:
+        network = create_network(config, room_code=code)
+        headless = create_game(config, network, journal_suffix=f".{code}")
+        return Room(code, network, headless.game, asyncio.create_task(headless.run()))
+
+    registry = RoomRegistry(
+        create_room,
+        worker_index=worker_index,
+        workers=server_config.getint('workers'),
+        max_rooms=server_config.getint('max_rooms')
+    )
+    server = RoomServer(registry, server_config.getint('port'), worker_ports(config))
+    await server.start()
+    await wait_for_stop()
+
+    logger.info(f"Zatrzymywanie procesu pokoi {worker_index}")
+    await server.close()
+
+
+def _room_worker_main(config_data: Dict[str, Dict[str, str]], worker_index: int):
+    config = configparser.ConfigParser()
+    config.read_dict(config_data)
+    try:
+        asyncio.run(run_room_server(config, worker_index))
+    except KeyboardInterrupt:
+        pass
+
+
+def run_room_workers(config: configparser.ConfigParser):
+    """Uruchamia procesy pokoi nasłuchujące na wspólnym porcie (SO_REUSEPORT)"""
+    config_data = {section: dict(config[section]) for section in config.sections()}
+    processes = [
+        multiprocessing.Process(target=_room_worker_main, args=(config_data, index),
+                                name=f"rooms-{index}")
+        for index in range(config['server'].getint('workers'))
+    ]
+    for process in processes:
+        process.start()
+
+    def stop_workers(signal_number, frame):
+        for process in processes:
+            process.terminate()  # SIGTERM - procesy zamykają pokoje same
+
+    signal.signal(signal.SIGTERM, stop_workers)
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.join()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serwer Quiz Party bez interfejsu")
+    parser.add_argument('--config', default='server.ini', help="plik konfiguracji (INI)")
+    parser.add_argument('--port', type=int, help="port WebSocket (nadpisuje konfigurację)")
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config)
+    if args.port:
+        config['server']['port'] = str(args.port)
+    try:
+        if not config['server'].getboolean('rooms'):
+            asyncio.run(run_server(config))
+        elif config['server'].getint('workers') > 1:
+            run_room_workers(config)
+        else:
+            asyncio.run(run_room_server(config))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
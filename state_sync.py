@@ -0,0 +1,174 @@
+"""
+Moduł synchronizacji stanu - host numeruje zmiany stanu gry (gracze, wyniki,
+grupy odpowiedzi) i rozsyła tylko różnice; klient, który zgubił zmiany, dostaje
+zbiorczą różnicę albo pełny stan
+"""
+
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Mapping, Optional, Tuple
+
+MSG_DELTA = 'state_delta'
+MSG_FULL = 'state_full'
+MSG_SYNC_REQUEST = 'sync_request'
+
+DELTA_HISTORY = 256  # Liczba ostatnich zmian, z których host składa zaległe różnice
+
+Changes = Dict[str, Any]
+
+
+def merge_changes(target: Changes, changes: Changes):
+    """Dokłada zmiany do zbiorczej różnicy (późniejsze nadpisują wcześniejsze)"""
+    players = target.setdefault('players', {})
+    for name in changes.get('leave', ()):
+        players.pop(name, None)
+        players[name] = False
+    for name in changes.get('join', ()):
+        players.pop(name, None)
+        players[name] = True
+    if 'scores' in changes:
+        target.setdefault('scores', {}).update(changes['scores'])
+    groups = target.setdefault('groups', {})
+    if 'round' in changes:
+        target['round'] = changes['round']
+        groups.clear()
+    for group in changes.get('groups', ()):
+        groups[group['answer']] = group
+
+
+def _pack_merged(merged: Changes) -> Changes:
+    """Zamienia zbiorczą różnicę na postać wysyłaną do klienta"""
+    changes = {}
+    players = merged.get('players', {})
+    leave = [name for name, joined in players.items() if not joined]
+    join = [name for name, joined in players.items() if joined]
+    if leave:
+        changes['leave'] = leave
+    if join:
+        changes['join'] = join
+    if merged.get('scores'):
+        changes['scores'] = merged['scores']
+    if 'round' in merged:
+        changes['round'] = merged['round']
+    if merged.get('groups'):
+        changes['groups'] = list(merged['groups'].values())
+    return changes
+
+
+class SyncedState:
+    """Stan gry widoczny dla klientów: gracze, wyniki, bieżąca runda i grupy odpowiedzi"""
+
+    def __init__(self):
+        self.version = 0
+        self.players: Dict[str, None] = {}  # Kolejność dołączenia
+        self.scores: Dict[str, int] = {}
+        self.round: Optional[int] = None
+        self.groups: Dict[str, Dict[str, Any]] = {}  # odpowiedź -> grupa
+
+    def apply(self, changes: Changes):
+        """Nakłada różnicę na stan"""
+        for name in changes.get('leave', ()):
+            self.players.pop(name, None)
+        for name in changes.get('join', ()):
+            # Ponowne dołączenie przesuwa gracza na koniec, jak przy kolejnych zmianach
+            self.players.pop(name, None)
+            self.players[name] = None
+        if 'scores' in changes:
+            self.scores.update(changes['scores'])
+        if 'round' in changes:
+            self.round = changes['round']
+            self.groups.clear()
+        for group in changes.get('groups', ()):
+            if group.get('removed'):
+                self.groups.pop(group['answer'], None)
+            else:
+                self.groups[group['answer']] = group
+
+    def to_message(self) -> Dict[str, Any]:
+        """Pełny stan jako wiadomość"""
+        return {
+            'type': MSG_FULL,
+            'version': self.version,
+            'players': list(self.players),
+            'scores': dict(self.scores),
+            'round': self.round,
+            'groups': list(self.groups.values())
+        }
+
+    def load_message(self, message: Dict[str, Any]):
+        """Zastępuje stan pełnym stanem z wiadomości"""
+        self.version = message['version']
+        self.players = dict.fromkeys(message.get('players', ()))
+        self.scores = dict(message.get('scores', {}))
+        self.round = message.get('round')
+        self.groups = {group['answer']: group for group in message.get('groups', ())}
+
+
+class StateSync(SyncedState):
+    """Stan po stronie hosta: każda zmiana dostaje kolejny numer wersji"""
+
+    def __init__(self, history: int = DELTA_HISTORY):
+        super().__init__()
+        self._history: Deque[Tuple[int, Changes]] = deque(maxlen=history)
+
+    def _commit(self, changes: Changes) -> Optional[Dict[str, Any]]:
+        """Zapisuje zmianę i zwraca wiadomość z różnicą (None, gdy nic się nie zmieniło)"""
+        if not changes:
+            return None
+        self.apply(changes)
+        self.version += 1
+        self._history.append((self.version, changes))
+        return dict(changes, type=MSG_DELTA, base=self.version - 1, version=self.version)
+
+    def player_joined(self, name: str) -> Optional[Dict[str, Any]]:
+        return self._commit({'join': [name]})
+
+    def player_left(self, name: str) -> Optional[Dict[str, Any]]:
+        if name not in self.players:
+            return None
+        return self._commit({'leave': [name]})
+
+    def update_scores(self, scores: Mapping[str, int]) -> Optional[Dict[str, Any]]:
+        """Wysyła tylko wyniki, które się zmieniły"""
+        changed = {name: score for name, score in scores.items() if self.scores.get(name) != score}
+        return self._commit({'scores': changed} if changed else {})
+
+    def start_round(self, round_number: int) -> Optional[Dict[str, Any]]:
+        """Nowa runda czyści grupy odpowiedzi"""
+        return self._commit({'round': round_number})
+
+    def update_groups(self, groups: Iterable[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Zmienione grupy odpowiedzi (np. z GameLogic.pop_grouping_changes)"""
+        groups = list(groups)
+        return self._commit({'groups': groups} if groups else {})
+
+    def catch_up(self, version: int) -> Dict[str, Any]:
+        """Zbiorcza różnica od wersji klienta albo pełny stan, gdy historia jej nie obejmuje"""
+        oldest = self._history[0][0] if self._history else self.version + 1
+        if version > self.version or version < oldest - 1:
+            return self.to_message()
+        merged: Changes = {}
+        for change_version, changes in self._history:
+            if change_version > version:
+                merge_changes(merged, changes)
+        return dict(_pack_merged(merged), type=MSG_DELTA, base=version, version=self.version)
+
+
+class StateReplica(SyncedState):
+    """Kopia stanu po stronie klienta"""
+
+    def apply_message(self, message: Dict[str, Any]) -> bool:
+        """Nakłada wiadomość synchronizacji; False, gdy brakuje wcześniejszych zmian"""
+        if message.get('type') == MSG_FULL:
+            self.load_message(message)
+            return True
+        if message['version'] <= self.version:
+            return True  # Zmiana już znana (np. pełny stan był nowszy)
+        if message['base'] != self.version:
+            return False
+        self.apply(message)
+        self.version = message['version']
+        return True
+
+    def sync_request(self) -> Dict[str, Any]:
+        """Prośba do hosta o zaległe zmiany"""
+        return {'type': MSG_SYNC_REQUEST, 'version': self.version}
@@ -0,0 +1,24 @@
+"""
+Wspólne ustawienia testów - moduły gry leżą w katalogu głównym repozytorium
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_logic import GameLogic  # noqa: E402
+
+
+@pytest.fixture
+def make_game(tmp_path):
+    """GameLogic z podanymi pytaniami (pliki pomocnicze trafiają do katalogu tymczasowego)"""
+    def factory(questions):
+        game = GameLogic(str(tmp_path / "questions.xlsx"))
+        game.questions = questions
+        game.start_new_game()
+        game.get_current_question()
+        return game
+    return factory
@@ -0,0 +1,94 @@
+"""
+Testy dopasowywania odpowiedzi (answer_matching)
+"""
+
+import pytest
+
+from answer_matching import AnswerMatcher, bounded_distance, normalize_answer, parse_aliases
+from game_logic import GameLogic
+
+
+@pytest.mark.parametrize("candidate", [
+    "Paryż", "paryz", "  PARYŻ!  ", "Pary", "Parsyż", "paris",
+])
+def test_accepts_case_diacritics_typos_and_aliases(candidate):
+    assert AnswerMatcher("paryż", ["Paris"]).matches(candidate)
+
+
+@pytest.mark.parametrize("candidate", ["", "londyn", "pa", "paryżewo i okolice"])
+def test_rejects_different_answers(candidate):
+    assert not AnswerMatcher("paryż").matches(candidate)
+
+
+@pytest.mark.parametrize("answer, candidate", [
+    ("Leonardo da Vinci", "da vinci"),
+    ("Leonardo da Vinci", "Vinci"),
+    ("Ludwig van Beethoven", "beethoven"),
+    ("Ludwig van Beethoven", "van bethoven"),
+    ("Thomas Edison", "edison"),
+])
+def test_accepts_surname_of_multi_word_answer(answer, candidate):
+    assert AnswerMatcher(answer).matches(candidate)
+
+
+@pytest.mark.parametrize("answer, candidate", [
+    ("Leonardo da Vinci", "leonardo"),  # Tylko ostatni wyraz
+    ("Leonardo da Vinci", "da"),
+    ("Republika Południowej Afryki", "południowej afryki"),  # Nie dowolny ciąg końcowych wyrazów
+    ("Kim Ir Sen", "sen"),  # Za krótkie
+    ("Fiat 126p", "126p"),  # Odpowiedzi z liczbami muszą być pełne
+])
+def test_rejects_other_parts_of_multi_word_answer(answer, candidate):
+    assert not AnswerMatcher(answer).matches(candidate)
+
+
+def test_default_questions_accept_surnames(tmp_path):
+    game = GameLogic(str(tmp_path / "questions.xlsx"))
+    pool = game.question_pool
+    matchers = {pool[index][1]: pool.get_matcher(index) for index in range(len(pool))}
+    assert matchers["leonardo da vinci"].matches("Da Vinci")
+    for answer, surname in (("thomas edison", "edison"), ("adam mickiewicz", "mickiewicz"),
+                            ("william shakespeare", "shakespeare"), ("ludwig van beethoven", "beethoven")):
+        assert matchers[answer].matches(surname)
+
+
+def test_short_form_accepted_through_alias():
+    matcher = AnswerMatcher("Thomas Edison", parse_aliases("Edison; T. Edison"))
+    assert matcher.matches("edison")
+    assert matcher.matches("t edison")
+    assert not matcher.matches("thomas")
+
+
+def test_spacing_is_ignored():
+    assert AnswerMatcher("New York").matches("NewYork")
+
+
+@pytest.mark.parametrize("answer, candidate", [("1939", "1938"), ("206", "207"), ("3", "4")])
+def test_numbers_must_match_exactly(answer, candidate):
+    matcher = AnswerMatcher(answer)
+    assert matcher.matches(answer)
+    assert not matcher.matches(candidate)
+
+
+def test_typo_limit_grows_with_length():
+    assert not AnswerMatcher("nil").matches("nie")  # Krótkie odpowiedzi bez literówek
+    assert AnswerMatcher("rysy").matches("rysa")  # Jedna literówka do 7 liter
+    assert not AnswerMatcher("rysy").matches("rasa")
+    assert AnswerMatcher("canberra").matches("kanbera")  # Dwie literówki w dłuższej odpowiedzi
+    assert not AnswerMatcher("canberra").matches("kanbeera x")
+
+
+def test_normalize_answer():
+    assert normalize_answer("  Łódź,  Kraków! ") == "lodz krakow"
+    assert normalize_answer("Straße") == "strasse"
+
+
+def test_parse_aliases():
+    assert parse_aliases("Paryż; Paris|PARI\n") == ("paryż", "paris", "pari")
+    assert parse_aliases(None) == ()
+    assert parse_aliases(["A ", ""]) == ("a",)
+
+
+def test_bounded_distance_counts_transpositions():
+    assert bounded_distance("abcd", "abdc", 2) == 1
+    assert bounded_distance("abc", "xyz", 1) == 2
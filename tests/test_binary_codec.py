@@ -0,0 +1,117 @@
+"""
+Testy kodowania binarnego (binary_codec) i dekodowania ramek (message_frame)
+"""
+
+import asyncio
+import json
+import zlib
+
+import pytest
+
+from binary_codec import BINARY_MAGIC, KNOWN_STRINGS, decode_binary, encode_binary, is_binary
+from message_frame import ENCODING_BINARY, ENCODING_JSON, Frame, decode_message, encode_message
+
+MESSAGE = {
+    'type': 'state_delta',
+    'version': 1234567,
+    'base': 1234566,
+    'scores': {"Zażółć": 3, "ala": -7, "ola": 63, "ela": 64, "iza": -(2 ** 70), "ewa": 2 ** 64},
+    'groups': [
+        {'answer': "paryż", 'players': "ala, ola", 'is_correct': True},
+        {'answer': "", 'players': "Zażółć", 'is_correct': False, 'removed': None},
+    ],
+    'client_time': 1697461234.125,
+    'progress': -0.5,
+    'data': b"\x00\xff\x78",
+    'nested': [[], {}, [0, [1, [2]]], ("krotka",)],
+}
+
+
+def expected(value):
+    """Krotki wracają jako listy"""
+    if isinstance(value, dict):
+        return {key: expected(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [expected(item) for item in value]
+    return value
+
+
+def test_round_trip():
+    data = encode_binary(MESSAGE)
+    assert is_binary(data) and data[0] == BINARY_MAGIC
+    assert decode_binary(data) == expected(MESSAGE)
+
+
+@pytest.mark.parametrize("value", [0, 1, 63, 64, 127, 128, -1, -64, -65, 2 ** 31, -(2 ** 63), 0.0, -1e300])
+def test_numbers_round_trip(value):
+    decoded = decode_binary(encode_binary({'score': value}))['score']
+    assert decoded == value and type(decoded) is type(value)
+
+
+def test_bool_and_none_are_not_ints():
+    decoded = decode_binary(encode_binary({'done': True, 'removed': False, 'error': None, 'total': 1}))
+    assert decoded == {'done': True, 'removed': False, 'error': None, 'total': 1}
+    assert decoded['done'] is True and decoded['removed'] is False and decoded['total'] is not True
+
+
+def test_known_strings_table():
+    assert len(KNOWN_STRINGS) <= 128  # Numer napisu mieści się w 7 bitach znacznika
+    assert len(set(KNOWN_STRINGS)) == len(KNOWN_STRINGS)
+    for text in KNOWN_STRINGS:
+        data = encode_binary([text])
+        assert len(data) == 4  # Znacznik, lista, liczba elementów, jeden bajt napisu
+        assert decode_binary(data) == [text]
+
+
+def test_known_string_as_value_and_similar_text():
+    message = {'type': 'type', 'answer': 'answer_', 'players': ['Type', 'type']}
+    assert decode_binary(encode_binary(message)) == message
+
+
+def test_repeated_strings_are_written_once():
+    names = [f"gracz{number}" for number in range(20)]
+    once = encode_binary({'players': names})
+    repeated = encode_binary({'players': names, 'scores': dict.fromkeys(names, 1), 'top': names})
+    assert repeated.count(b"gracz7") == 1
+    assert len(repeated) < 2 * len(once)
+    assert decode_binary(repeated) == {'players': names, 'scores': dict.fromkeys(names, 1), 'top': names}
+
+
+def test_binary_is_smaller_than_json():
+    assert len(encode_binary(expected({**MESSAGE, 'data': None}))) < len(
+        json.dumps(expected({**MESSAGE, 'data': None}), ensure_ascii=False).encode("utf-8"))
+
+
+@pytest.mark.parametrize("data", [b"", b"{}", bytes([BINARY_MAGIC, 0x0A]), bytes([BINARY_MAGIC, 0x3F])])
+def test_invalid_data_raises_value_error(data):
+    with pytest.raises(ValueError):
+        decode_binary(data)
+
+
+def test_unsupported_type_raises_type_error():
+    with pytest.raises(TypeError):
+        encode_binary({'data': {1, 2}})
+
+
+@pytest.mark.parametrize("compress", [False, True])
+@pytest.mark.parametrize("encoding", [ENCODING_JSON, ENCODING_BINARY])
+def test_frame_variants_decode_to_same_message(compress, encoding):
+    message = {'type': 'players_list', 'players': [f"gracz{number}" for number in range(100)]}
+    frame = Frame(message)
+
+    class Recorder:
+        async def send(self, data, text=False):
+            self.sent = data.decode("utf-8") if text else data  # Ramka tekstowa dociera jako str
+
+    recorder = Recorder()
+    asyncio.run(frame.send(recorder, compress=compress, encoding=encoding))
+    if compress:
+        assert isinstance(recorder.sent, bytes) and recorder.sent[:1] == b"\x78"  # zlib
+    assert decode_message(recorder.sent) == message
+
+
+def test_decode_message_accepts_every_encoding():
+    message = {'type': 'answer', 'answer': "Łódź", 'players': ["ala"]}
+    for raw in (encode_message(message), encode_message(message, ENCODING_BINARY),
+                zlib.compress(encode_binary(message)), zlib.compress(json.dumps(message).encode("utf-8"))):
+        assert decode_message(raw) == message
@@ -0,0 +1,143 @@
+"""
+Testy dziennika gry (game_journal) - zapis, sumy kontrolne i odtwarzanie stanu GameLogic
+"""
+
+import pytest
+
+import game_journal
+from game_journal import (REC_ANSWER, REC_NEXT, GameJournal, encode_record, pack_strings,
+                          read_journal, unpack_strings)
+from game_logic import GameLogic
+
+QUESTIONS = [
+    ("Stolica Francji?", "paryż", ("paris",)),
+    ("Najwyższy szczyt Tatr?", "Gerlach", ()),
+    ("Rok chrztu Polski?", "966", ()),
+]
+
+
+def ordered_questions(game):
+    return [game.question_pool[index] for index in game.question_order]
+
+
+def write_records(path, records):
+    with open(path, "wb") as f:
+        for record_type, payload in records:
+            f.write(encode_record(record_type, payload))
+
+
+def test_pack_strings_round_trip():
+    values = ["", "zażółć gęślą jaźń", "a|b", "x" * 1000]
+    assert unpack_strings(pack_strings(values)) == values
+    assert unpack_strings(pack_strings([])) == []
+
+
+def test_long_string_cut_on_character_boundary():
+    text = "ż" * 40000  # 80000 bajtów UTF-8 - więcej niż mieści pole długości
+    (value,) = unpack_strings(pack_strings([text]))
+    assert value == "ż" * (0xFFFF // 2)
+
+
+def test_read_journal_stops_at_truncated_tail(tmp_path):
+    path = tmp_path / "game.journal"
+    write_records(path, [(REC_ANSWER, pack_strings(["ala", "paryż"])), (REC_NEXT, b"")])
+    with open(path, "ab") as f:
+        f.write(encode_record(REC_ANSWER, pack_strings(["ola", "rzym"]))[:-3])
+    assert [record_type for record_type, _ in read_journal(str(path))] == [REC_ANSWER, REC_NEXT]
+
+
+def test_read_journal_stops_at_bad_crc(tmp_path):
+    path = tmp_path / "game.journal"
+    write_records(path, [(REC_NEXT, b""), (REC_ANSWER, pack_strings(["ala", "paryż"])), (REC_NEXT, b"")])
+    data = bytearray(path.read_bytes())
+    data[len(encode_record(REC_NEXT)) + 8] ^= 0xFF  # Bajt danych drugiego rekordu
+    path.write_bytes(bytes(data))
+    assert [record_type for record_type, _ in read_journal(str(path))] == [REC_NEXT]
+
+
+def test_journal_append_and_close(tmp_path):
+    path = str(tmp_path / "game.journal")
+    journal = GameJournal(path, flush_interval=0.01)
+    journal.begin_game(pack_strings(["pytanie"]))
+    journal.append(REC_ANSWER, pack_strings(["ala", "paryż"]))
+    journal.close()
+    journal.append(REC_NEXT)  # Po zamknięciu rekordy są pomijane
+
+    records = list(read_journal(path))
+    assert records == [(game_journal.REC_START, pack_strings(["pytanie"])),
+                       (REC_ANSWER, pack_strings(["ala", "paryż"]))]
+
+
+def play_journaled_game(tmp_path):
+    """Rozgrywa półtorej rundy z dziennikiem; zwraca grę i ścieżkę dziennika"""
+    path = str(tmp_path / "game.journal")
+    game = GameLogic(str(tmp_path / "questions.xlsx"))
+    game.questions = QUESTIONS
+    game.attach_journal(path)
+    game.start_new_game()
+    players = ["ala", "ola", "ela"]
+
+    game.get_current_question()
+    game.add_player_answer("ala", "paris")
+    game.add_player_answer("ola", "lyon")
+    game.add_player_answer("ela", "rzym")
+    game.start_voting(players)
+    game.add_vote("ola", "rzym")
+    game.add_vote("ela", "paryż")
+    game.calculate_round_scores(players)
+    game.next_question()
+
+    game.get_current_question()
+    game.add_player_answer("ola", "gerlach")
+    game.add_player_answer("ala", "rysy")
+    game.add_player_answer("ela", "giewont")
+    game.start_voting(players)
+    game.remove_player("ela")
+    game.journal.close()
+    return game, path
+
+
+def test_replay_restores_round_state(tmp_path):
+    game, path = play_journaled_game(tmp_path)
+    restored = GameLogic(str(tmp_path / "questions.xlsx"))
+    assert restored.replay_journal(path) == 14
+
+    assert ordered_questions(restored) == ordered_questions(game)
+    assert restored.current_question_index == game.current_question_index
+    assert restored.game_phase == game.game_phase == "voting"
+    assert restored.get_current_scores() == game.get_current_scores()
+    assert dict(restored.current_answers) == dict(game.current_answers)
+    assert restored.can_player_vote("ala") and not restored.can_player_vote("ola")
+    assert not restored.can_player_vote("ela")
+    assert restored.votes_outstanding == game.votes_outstanding == 1
+    assert restored.create_snapshot() == game.create_snapshot()
+
+
+def test_replay_keeps_question_order_after_reset(tmp_path):
+    game, path = play_journaled_game(tmp_path)
+    game.attach_journal(path)
+    game.reset_game()
+    game.journal.close()
+
+    for _ in range(5):  # Odtworzenie nie może wylosować własnej kolejności pytań
+        restored = GameLogic(str(tmp_path / "questions.xlsx"))
+        restored.replay_journal(path)
+        assert ordered_questions(restored) == ordered_questions(game)
+        assert restored.game_phase == "waiting"
+        assert restored.get_current_scores() == {}
+
+
+def test_replay_of_missing_journal(tmp_path):
+    game = GameLogic(str(tmp_path / "questions.xlsx"))
+    assert game.replay_journal(str(tmp_path / "brak.journal")) == 0
+
+
+@pytest.mark.parametrize("cut", [1, 5, 9])
+def test_replay_ignores_damaged_tail(tmp_path, cut):
+    game, path = play_journaled_game(tmp_path)
+    with open(path, "ab") as f:
+        f.write(encode_record(REC_ANSWER, pack_strings(["ola", "tatry"]))[:cut])
+
+    restored = GameLogic(str(tmp_path / "questions.xlsx"))
+    assert restored.replay_journal(path) == 14
+    assert restored.current_answers["ola"] == "gerlach"
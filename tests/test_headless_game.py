@@ -0,0 +1,81 @@
+"""
+Testy serwera dedykowanego (server.HeadlessGame) - kolejne gry bez graczy i bez czekania
+"""
+
+import asyncio
+
+from game_logic import GameLogic
+from network_manager import NetworkManager
+from player_session import PlayerSession
+from server import HeadlessGame
+
+
+def play_games(game, count):
+    """Rozgrywa kolejne gry i zwraca ich pytania"""
+    async def run():
+        network = NetworkManager(is_host=True, heartbeat_interval=None)
+        headless = HeadlessGame(network, game, answer_time=0, vote_time=0, results_time=0)
+        played = []
+        for _ in range(count):
+            await headless.play_game()
+            played.append(game.questions)
+        return played
+    return asyncio.run(run())
+
+
+def test_each_game_draws_new_questions(tmp_path):
+    game = GameLogic(str(tmp_path / "questions.xlsx"), question_count=5, rotate_questions=True)
+    played = play_games(game, 3)
+    assert all(len(questions) == 5 for questions in played)
+    # Z rotacją pytania nie powtarzają się, dopóki bank się nie wyczerpie
+    asked = [question for questions in played for question in questions]
+    assert len(set(asked)) == len(asked)
+
+
+def test_players_get_scoreboard_slices_instead_of_score_table(tmp_path):
+    game = GameLogic(str(tmp_path / "questions.xlsx"), question_count=2)
+    players = [f"gracz{number}" for number in range(4)]
+    sessions = {name: PlayerSession(name) for name in players}
+
+    async def run():
+        network = NetworkManager(is_host=True, heartbeat_interval=None)
+        for name in players:
+            network.players[name] = None  # Rozłączeni - ramki zostają w sesjach
+        network.sessions.update(sessions)
+        await HeadlessGame(network, game, answer_time=0, vote_time=0, results_time=0).play_game()
+
+    asyncio.run(run())
+    for session in sessions.values():
+        messages = [frame.message for frame in session.buffer]
+        assert not any('scores' in message for message in messages)
+        results = [message for message in messages if message['type'] in ('round_results', 'game_over')]
+        assert [message['type'] for message in results] == ['round_results', 'round_results', 'game_over']
+        assert all(message['scoreboard']['total_players'] == len(players) for message in results)
+
+
+def test_answer_groups_are_synced_when_answering_closes(tmp_path):
+    game = GameLogic(str(tmp_path / "questions.xlsx"), question_count=1)
+    sessions = {name: PlayerSession(name) for name in ("ala", "ola")}
+
+    async def run():
+        network = NetworkManager(is_host=True, heartbeat_interval=None)
+        for name in sessions:
+            network.players[name] = None
+        network.sessions.update(sessions)
+        headless = HeadlessGame(network, game, answer_time=5, vote_time=0, results_time=0)
+        playing = asyncio.create_task(headless.play_game())
+        while not any(frame.message['type'] == 'question' for frame in sessions["ala"].buffer):
+            await asyncio.sleep(0.01)
+        headless.on_answer({'player_name': "ala", 'answer': "rzym"})
+        headless.on_answer({'player_name': "ola", 'answer': "londyn"})
+        await playing
+        return network
+
+    network = asyncio.run(run())
+    assert set(network.state_sync.groups) == {"rzym", "londyn"}
+    messages = [frame.message for frame in sessions["ola"].buffer]
+    types = [message['type'] for message in messages]
+    synced = [index for index, message in enumerate(messages) if message.get('groups')]
+    # Grupy (z cudzymi odpowiedziami) dopiero po zamknięciu odpowiedzi, tuż przed głosowaniem
+    assert len(synced) == 1 and types.index('question') < synced[0] < types.index('voting')
+    assert {group['answer'] for group in messages[synced[0]]['groups']} == {"rzym", "londyn"}
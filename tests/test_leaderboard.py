@@ -0,0 +1,82 @@
+"""
+Testy rankingu (leaderboard) - miejsca przy remisach i sąsiedzi w rankingu
+"""
+
+import random
+
+from leaderboard import Leaderboard
+
+
+def make_board(scores):
+    board = Leaderboard()
+    for player_id, score in scores.items():
+        board.update(player_id, score)
+    return board
+
+
+def test_ties_share_rank():
+    board = make_board({0: 5, 1: 7, 2: 5, 3: 2, 4: 7})
+    assert [board.rank(player_id) for player_id in range(5)] == [3, 1, 3, 5, 1]
+    assert board.ordered() == [(1, 7, 1), (4, 7, 1), (0, 5, 3), (2, 5, 3), (3, 2, 5)]
+    assert board.top(3) == [(1, 7, 1), (4, 7, 1), (0, 5, 3)]
+
+
+def test_around_returns_neighbours_with_ranks():
+    board = make_board({0: 5, 1: 7, 2: 5, 3: 2, 4: 7})
+    assert board.around(0, 1) == [(4, 7, 1), (0, 5, 3), (2, 5, 3)]
+    assert board.around(1, 1) == [(1, 7, 1), (4, 7, 1)]  # Na brzegu rankingu
+    assert board.around(3, 2) == [(0, 5, 3), (2, 5, 3), (3, 2, 5)]
+
+
+def test_update_and_remove_move_players():
+    board = make_board({0: 5, 1: 7, 2: 5})
+    board.update(2, 9)
+    assert board.top(1) == [(2, 9, 1)]
+    assert board.rank(0) == 3
+
+    board.update(0, 7)  # Remis z graczem 1
+    assert board.rank(0) == board.rank(1) == 2
+
+    board.remove(2)
+    assert 2 not in board
+    assert len(board) == 2
+    assert board.ordered() == [(0, 7, 1), (1, 7, 1)]
+    board.remove(2)  # Ponowne usunięcie niczego nie psuje
+
+
+def test_matches_full_sort_after_random_updates():
+    rng = random.Random(7)
+    board = Leaderboard()
+    scores = {}
+    for _ in range(300):
+        player_id = rng.randrange(20)
+        if rng.random() < 0.1:
+            board.remove(player_id)
+            scores.pop(player_id, None)
+        else:
+            scores[player_id] = rng.randrange(10)
+            board.update(player_id, scores[player_id])
+
+    expected = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+    assert [(player_id, score) for player_id, score, _ in board.ordered()] == expected
+    for player_id, score in scores.items():
+        assert board.rank(player_id) == 1 + sum(other > score for other in scores.values())
+
+
+def test_scoreboard_for_player(make_game):
+    game = make_game([("Stolica Francji?", "paryż", ())])
+    for name, answer in (("ala", "paryż"), ("ola", "paryż"), ("ela", "rzym"), ("iza", "rzym")):
+        game.add_player_answer(name, answer)
+    players = ["ala", "ola", "ela", "iza", "ewa"]
+    game.start_voting(players)
+    game.add_vote("ela", "paryż")
+    game.calculate_round_scores(players)  # ala 3, ola 3, ela 2, iza 0, ewa 0
+
+    board = game.get_scoreboard_for("ela", top_k=2, radius=1)
+    assert board["rank"] == 3
+    assert board["total_players"] == 5
+    assert [entry["rank"] for entry in board["top"]] == [1, 1]
+    assert {entry["player"] for entry in board["top"]} == {"ala", "ola"}
+    assert [(entry["score"], entry["rank"]) for entry in board["near"]] == [(3, 1), (2, 3), (0, 4)]
+    assert game.get_player_rank("ewa") == game.get_player_rank("iza") == 4
+    assert game.get_scoreboard_for("nikt")["rank"] is None
@@ -0,0 +1,140 @@
+"""
+Testy wznawiania sesji gracza (player_session, NetworkManager) - bufor przegapionych
+wiadomości, pełny stan po jego przepełnieniu oraz rozłączeni gracze w trakcie rundy
+"""
+
+import asyncio
+import json
+import socket
+
+import websockets
+
+from message_frame import Frame, decode_message
+from network_manager import MSG_PLAYER_AWAY, MSG_PLAYER_BACK, NetworkManager
+from player_session import PlayerSession
+from state_sync import MSG_FULL
+
+
+def frames(first, last):
+    return [Frame({'type': 'answer_count', 'done': seq}, seq) for seq in range(first, last + 1)]
+
+
+def test_missed_returns_frames_after_last_seq():
+    session = PlayerSession("ala", buffer_size=4)
+    for frame in frames(1, 3):
+        session.record(frame)
+    assert [frame.seq for frame in session.missed(1)] == [2, 3]
+    assert session.missed(3) == []
+    assert [frame.seq for frame in session.missed(0)] == [1, 2, 3]
+
+
+def test_missed_after_eviction_needs_full_state():
+    session = PlayerSession("ala", buffer_size=4)
+    for frame in frames(1, 10):
+        session.record(frame)
+    assert session.evicted_seq == 6
+    assert session.missed(5) is None  # Ramka 6 wypadła z bufora
+    assert [frame.seq for frame in session.missed(6)] == [7, 8, 9, 10]
+
+
+def test_tokens_are_unique():
+    assert len({PlayerSession("ala").token for _ in range(100)}) == 100
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def receive_all(websocket, timeout=0.2):
+    """Wiadomości, które przyszły do chwili, gdy host na dłużej zamilkł"""
+    messages = []
+    try:
+        while True:
+            messages.append(decode_message(await asyncio.wait_for(websocket.recv(), timeout)))
+    except asyncio.TimeoutError:
+        return messages
+
+
+async def join(port, **fields):
+    websocket = await websockets.connect(f"ws://127.0.0.1:{port}")
+    await websocket.send(json.dumps(dict({'type': 'join', 'player_name': "ala"}, **fields)))
+    return websocket, await receive_all(websocket)
+
+
+async def resume_after_missed(missed_count):
+    """Klient zrywa połączenie, host rozsyła wiadomości, klient wraca z tokenem"""
+    host = NetworkManager(is_host=True, port=free_port(), replay_buffer_size=4,
+                          resume_grace=30, heartbeat_interval=None)
+    server = asyncio.create_task(host.start_server("host"))
+    try:
+        while host.server is None:
+            await asyncio.sleep(0.01)
+
+        websocket, received = await join(host.port)
+        assert received[0]['type'] == 'join_success'
+        token = received[0]['resume_token']
+        last_seq = max(message['seq'] for message in received if 'seq' in message)
+        await websocket.close()
+        while "ala" in host.connections:
+            await asyncio.sleep(0.01)
+        assert "ala" in host.players  # Miejsce czeka na powrót
+
+        for done in range(missed_count):
+            await host.broadcast_answer_count(done, 9)
+
+        websocket, received = await join(host.port, resume_token=token, last_seq=last_seq)
+        await websocket.close()
+        local = [message['type'] for message in host.get_pending_messages()]
+        return received, local
+    finally:
+        await host.close()
+        await server
+
+
+def test_resume_replays_missed_messages():
+    received, local = asyncio.run(resume_after_missed(3))
+    assert received[0]['type'] == 'join_success' and received[0]['resumed']
+    assert [(message['type'], message['done']) for message in received[1:]] == [
+        ('answer_count', 0), ('answer_count', 1), ('answer_count', 2)]
+    assert local[-2:] == [MSG_PLAYER_AWAY, MSG_PLAYER_BACK]
+
+
+def test_resume_falls_back_to_full_state_after_eviction():
+    received, _ = asyncio.run(resume_after_missed(6))
+    assert received[0]['resumed']
+    assert [message['type'] for message in received[1:]] == [MSG_FULL]
+    assert received[1]['players'] == ["host", "ala"]
+
+
+def test_away_player_does_not_stall_answers(make_game):
+    game = make_game([("Stolica Francji?", "paryż", ())])
+    players = ["ala", "ola", "ela"]
+    game.add_player_answer("ala", "rzym")
+    game.add_player_answer("ola", "londyn")
+    assert not game.are_all_answers_submitted(players)
+
+    game.set_player_away("ela")
+    assert game.are_all_answers_submitted(players)
+    game.set_player_away("ela", False)
+    assert not game.are_all_answers_submitted(players)
+
+
+def test_away_player_does_not_stall_votes(make_game):
+    game = make_game([("Stolica Francji?", "paryż", ())])
+    players = ["ala", "ola", "ela"]
+    for player in players:
+        game.add_player_answer(player, "rzym" if player == "ala" else "londyn")
+    game.start_voting(players)
+    game.add_vote("ala", "londyn")
+    game.add_vote("ola", "rzym")
+    assert not game.are_all_votes_submitted(players)
+
+    game.set_player_away("ela")
+    assert game.are_all_votes_submitted(players)
+    game.set_player_away("ela", False)  # Wrócił przed końcem głosowania - znów czekamy
+    assert not game.are_all_votes_submitted(players)
+    game.set_player_away("ela")
+    game.remove_player("ela")  # Czas na powrót minął
+    assert game.votes_outstanding == 0
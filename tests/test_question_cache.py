@@ -0,0 +1,75 @@
+"""
+Testy cache pytań (question_cache) - zapis w JSON, odrzucanie nieaktualnych
+i podrobionych plików, start z cache bez openpyxl
+"""
+
+import json
+import os
+import pickle
+import subprocess
+import sys
+
+from question_cache import CACHE_VERSION, get_cache_path, load_cached_questions, save_questions_cache
+
+QUESTIONS = [("Stolica Francji?", "paryż", ("paris",)), ("Ile to 2+2?", "4", ())]
+
+
+def make_bank(tmp_path):
+    path = tmp_path / "pack.csv"
+    path.write_text("pytanie,odpowiedź\nStolica Francji?,paryż\n", encoding="utf-8")
+    return str(path), get_cache_path(str(path))
+
+
+def test_round_trip(tmp_path):
+    bank, cache = make_bank(tmp_path)
+    save_questions_cache(cache, [bank], QUESTIONS)
+    with open(cache, encoding="utf-8") as f:
+        assert json.load(f)["version"] == CACHE_VERSION
+    assert load_cached_questions(cache, [bank]) == QUESTIONS
+
+
+def test_changed_bank_invalidates_cache(tmp_path):
+    bank, cache = make_bank(tmp_path)
+    save_questions_cache(cache, [bank], QUESTIONS)
+    with open(bank, "a", encoding="utf-8") as f:
+        f.write("Stolica Włoch?,rzym\n")
+    assert load_cached_questions(cache, [bank]) is None
+    assert load_cached_questions(cache, [bank, bank]) is None
+
+
+class Payload:
+    def __reduce__(self):
+        return (os.system, ("echo pwned",))
+
+
+def test_pickled_file_is_not_executed(tmp_path):
+    bank, cache = make_bank(tmp_path)
+    with open(cache, "wb") as f:
+        pickle.dump({"version": CACHE_VERSION, "payload": Payload()}, f)
+    assert load_cached_questions(cache, [bank]) is None
+
+
+def test_malformed_cache_is_rejected(tmp_path):
+    bank, cache = make_bank(tmp_path)
+    stat = os.stat(bank)
+    for cached in ({"version": CACHE_VERSION, "sources": [[bank]], "questions": []},
+                   {"version": CACHE_VERSION, "sources": [[bank, stat.st_mtime_ns, stat.st_size, "x"]],
+                    "questions": [["tylko pytanie"]]},
+                   [1, 2, 3]):
+        with open(cache, "w", encoding="utf-8") as f:
+            json.dump(cached, f)
+        assert load_cached_questions(cache, [bank]) is None
+
+
+def test_cache_hit_skips_openpyxl(tmp_path):
+    script = (
+        "import sys\n"
+        "from game_logic import GameLogic\n"
+        f"game = GameLogic({str(tmp_path / 'questions.xlsx')!r})\n"
+        "print(len(game.question_pool), 'openpyxl' in sys.modules)\n"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    runs = [subprocess.run([sys.executable, "-c", script], cwd=root, capture_output=True,
+                           text=True, check=True).stdout.split() for _ in range(2)]
+    assert runs[0] == ["30", "True"]  # Domyślny skoroszyt utworzony i wczytany przez openpyxl
+    assert runs[1] == ["30", "False"]
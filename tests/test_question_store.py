@@ -0,0 +1,83 @@
+"""
+Testy bazy pytań SQLite (question_store) - losowanie z filtrami i gra z pustym filtrem
+"""
+
+import logging
+import random
+from collections import Counter
+
+import openpyxl
+import pytest
+
+import question_store
+from game_logic import GameLogic
+from question_store import QuestionStore
+
+ROWS = 3000
+
+
+@pytest.fixture(scope="module")
+def workbook(tmp_path_factory):
+    """Skoroszyt z co dziesiątym pytaniem z historii, reszta z geografii"""
+    path = tmp_path_factory.mktemp("store") / "questions.xlsx"
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["Pytanie", "Odpowiedź", "Kategoria", "Trudność"])
+    for number in range(ROWS):
+        category = "historia" if number % 10 == 0 else "geografia"
+        sheet.append([f"Pytanie {number}", f"{category}-{number}", category, number % 3])
+    workbook.save(path)
+    return str(path)
+
+
+@pytest.fixture(scope="module")
+def store(workbook):
+    store = QuestionStore(QuestionStore.path_for_workbook(workbook))
+    store.import_workbook(workbook)
+    return store
+
+
+def categories(questions):
+    return {answer.split("-")[0] for _, answer, _ in questions}
+
+
+@pytest.mark.parametrize("scan_limit", [question_store.SAMPLE_SCAN_LIMIT, 100])
+def test_sample_respects_filters(store, monkeypatch, scan_limit):
+    monkeypatch.setattr(question_store, "SAMPLE_SCAN_LIMIT", scan_limit)  # 100: losowanie z zakresu
+    questions = store.sample(25, category="Historia")
+    assert len(questions) == 25
+    assert len(set(questions)) == 25
+    assert categories(questions) == {"historia"}
+
+    questions = store.sample(25, category="geografia", difficulty=1)
+    assert len(set(questions)) == 25
+    assert all(int(answer.split("-")[1]) % 3 == 1 for _, answer, _ in questions)
+
+
+def test_sample_when_filter_has_fewer_questions(store):
+    assert store.count(category="historia", difficulty=2) == 100
+    assert len(store.sample(500, category="historia", difficulty=2)) == 100
+    assert store.count(category="brak") == 0
+    assert store.sample(25, category="brak") == []
+
+
+def test_range_probing_is_uniform(store, monkeypatch):
+    monkeypatch.setattr(question_store, "SAMPLE_SCAN_LIMIT", 100)
+    random.seed(5)
+    drawn = Counter(answer for _ in range(600) for _, answer, _ in store.sample(10, category="historia"))
+    assert len(drawn) == ROWS // 10  # Każde pytanie z kategorii trafiło się choć raz
+    assert max(drawn.values()) < 3 * 600 * 10 / (ROWS // 10)
+
+
+def test_empty_filter_keeps_previous_questions(workbook, caplog):
+    game = GameLogic(workbook, question_count=5, use_store=True)
+    game.start_new_game(category="historia")
+    previous = game.questions
+    assert len(previous) == 5 and categories(game.question_pool) == {"historia"}
+
+    with caplog.at_level(logging.WARNING, logger="game_logic"):
+        game.start_new_game(category="brak")
+    assert "Brak pytań dla filtrów" in caplog.text
+    assert game.questions == previous
+    assert game.question_filters['category'] == "historia"
+    assert not game.is_game_finished()
@@ -0,0 +1,77 @@
+"""
+Testy kolumnowego stanu rundy (round_state)
+"""
+
+from round_state import (NO_ANSWER, PlayerTable, RoundColumnView, RoundState, ScoreTable,
+                         ScoresView)
+
+
+def test_player_table_interns_names_once():
+    players = PlayerTable()
+    assert players.intern("ala") == 0
+    assert players.intern("ola") == 1
+    assert players.intern("ala") == 0
+    assert players.get("ela") is None
+    assert len(players) == 2
+
+
+def test_score_table_add_and_reset():
+    players = PlayerTable()
+    table = ScoreTable()
+    view = ScoresView(players, table)
+    ala, ola = players.intern("ala"), players.intern("ola")
+    table.add(ola, 3)
+    table.add(ala, 2)
+    table.add(ola, 1)
+    assert dict(view) == {"ola": 4, "ala": 2}
+    assert list(view) == ["ola", "ala"]  # Kolejność dodania do tabeli
+
+    table.reset()
+    assert len(view) == 0
+    assert not table.has(ala)
+    table.ensure(ala)
+    assert view["ala"] == 0
+
+
+def test_round_columns_and_clear():
+    players = PlayerTable()
+    state = RoundState()
+    answers = RoundColumnView(players, state)
+    votes = RoundColumnView(players, state, votes=True)
+    for name in ("ala", "ola", "ela"):
+        players.intern(name)
+    state.grow(len(players))
+
+    paris = state.text_id("paryż")
+    assert state.text_id("paryż") == paris
+    state.answer_of[2] = paris
+    state.answered.append(2)
+    state.vote_of[0] = state.text_id("rzym")
+    state.voted.append(0)
+    state.eligible[0] = 1
+
+    assert dict(answers) == {"ela": "paryż"}
+    assert dict(votes) == {"ala": "rzym"}
+    assert "ola" not in answers
+
+    state.clear()
+    assert len(answers) == 0 and len(votes) == 0
+    assert list(state.answer_of) == [NO_ANSWER] * 3
+    assert list(state.vote_of) == [NO_ANSWER] * 3
+    assert not any(state.eligible)
+    assert state.texts == [] and state.groups == []
+
+
+def test_changed_answer_moves_player_between_groups(make_game):
+    game = make_game([("Stolica Francji?", "paryż", ())])
+    game.add_player_answer("ala", "rzym")
+    game.add_player_answer("ola", "rzym")
+    game.pop_grouping_changes()
+
+    game.add_player_answer("ala", "Paryż")
+    groups = {group["answer"]: group for group in game.get_grouped_answers()}
+    assert groups["paryż"]["is_correct"]
+    assert "ala" in groups["paryż"]["players"]
+    assert "ala" not in groups["rzym"]["players"]
+    assert {group["answer"] for group in game.pop_grouping_changes()} == {"paryż", "rzym"}
+    assert game.current_answers["ala"] == "paryż"
@@ -0,0 +1,72 @@
+"""
+Testy punktacji rundy - wyniki muszą być takie jak w pierwotnej wersji calculate_round_scores
+"""
+
+import random
+
+import pytest
+
+TEXTS = ["paryż", "pary", "londyn", "rzym", "berlin"]  # "pary" to poprawna odpowiedź z literówką
+
+
+def baseline_round_scores(players, answers, votes, is_correct):
+    """Punktacja z pierwotnej wersji calculate_round_scores (słowniki zamiast kolumn)"""
+    round_scores = {player: 0 for player in players}
+    correct_players = [player for player, answer in answers.items() if is_correct(answer)]
+    for player in correct_players:
+        round_scores[player] += 3
+    for voter, voted_answer in votes.items():
+        if is_correct(voted_answer) and voter not in correct_players:
+            round_scores[voter] += 2
+    for voter, voted_answer in votes.items():
+        for player, player_answer in answers.items():
+            if player_answer == voted_answer and not is_correct(player_answer):
+                round_scores[player] += 1
+    return round_scores
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_baseline_over_several_rounds(make_game, seed):
+    rng = random.Random(seed)
+    game = make_game([("Stolica Francji?", "paryż", ())] * 3)
+    players = [f"gracz{i}" for i in range(rng.randint(2, 9))]
+    totals = dict.fromkeys(players, 0)
+
+    while not game.is_game_finished():
+        game.get_current_question()
+        answers = {}
+        for player in players:
+            if rng.random() < 0.8:
+                answers[player] = rng.choice(TEXTS)
+                game.add_player_answer(player, answers[player])
+
+        game.start_voting(players)
+        votes = {}
+        for player in players:
+            if game.can_player_vote(player) and rng.random() < 0.9:
+                votes[player] = rng.choice(TEXTS)
+                game.add_vote(player, votes[player])
+
+        expected = baseline_round_scores(players, answers, votes, game.is_answer_correct)
+        assert game.calculate_round_scores(players) == expected
+        for player, points in expected.items():
+            totals[player] += points
+        game.next_question()
+
+    scores = game.get_current_scores()
+    assert scores == totals
+    assert list(scores.values()) == sorted(totals.values(), reverse=True)
+
+
+def test_vote_on_own_wrong_answer_counts(make_game):
+    game = make_game([("Stolica Francji?", "paryż", ())])
+    game.add_player_answer("ala", "londyn")
+    game.add_player_answer("ola", "londyn")
+    game.add_player_answer("ela", "paryż")
+    game.start_voting(["ala", "ola", "ela"])
+    game.add_vote("ala", "londyn")
+    game.add_vote("ola", "paryż")
+    game.add_vote("ela", "londyn")  # Poprawnie odpowiadający nie głosują
+
+    assert game.calculate_round_scores(["ala", "ola", "ela"]) == {"ala": 1, "ola": 3, "ela": 3}
+    assert game.game_phase == "results"
@@ -0,0 +1,117 @@
+"""
+Testy synchronizacji stanu (state_sync) - różnice, luki w wersjach i nadrabianie z historii
+"""
+
+import random
+
+from state_sync import MSG_DELTA, MSG_FULL, StateReplica, StateSync
+
+
+def state_of(state):
+    return list(state.players), state.scores, state.round, state.groups
+
+
+def test_replica_follows_deltas():
+    host = StateSync()
+    replica = StateReplica()
+    messages = [
+        host.player_joined("ala"),
+        host.player_joined("ola"),
+        host.start_round(1),
+        host.update_groups([{'answer': "paryż", 'players': "ala", 'is_correct': True}]),
+        host.update_scores({"ala": 3, "ola": 0}),
+        host.player_left("ola"),
+    ]
+    for message in messages:
+        assert message['type'] == MSG_DELTA
+        assert replica.apply_message(message)
+    assert replica.version == host.version == 6
+    assert state_of(replica) == state_of(host)
+
+
+def test_unchanged_state_sends_nothing():
+    host = StateSync()
+    host.player_joined("ala")
+    host.update_scores({"ala": 3})
+    assert host.update_scores({"ala": 3}) is None
+    assert host.update_groups([]) is None
+    assert host.player_left("ola") is None
+    assert host.version == 2
+
+
+def test_version_gap_is_detected():
+    host = StateSync()
+    replica = StateReplica()
+    assert replica.apply_message(host.player_joined("ala"))
+    host.player_joined("ola")  # Zgubiona zmiana
+    assert not replica.apply_message(host.player_joined("ela"))
+    assert replica.version == 1
+    assert replica.sync_request() == {'type': 'sync_request', 'version': 1}
+
+
+def test_catch_up_merges_history():
+    host = StateSync()
+    replica = StateReplica()
+    replica.apply_message(host.player_joined("ala"))
+    host.player_joined("ola")
+    host.start_round(1)
+    host.update_groups([{'answer': "rzym", 'players': "ola", 'is_correct': False}])
+    host.start_round(2)  # Grupy poprzedniej rundy nie trafiają do różnicy
+    host.update_groups([{'answer': "966", 'players': "ala", 'is_correct': True}])
+    host.player_left("ala")
+    host.player_joined("ala")
+
+    delta = host.catch_up(replica.version)
+    assert delta['type'] == MSG_DELTA
+    assert (delta['base'], delta['version']) == (1, host.version)
+    assert [group['answer'] for group in delta['groups']] == ["966"]
+    assert replica.apply_message(delta)
+    assert state_of(replica) == state_of(host)
+
+
+def test_catch_up_falls_back_to_full_state():
+    host = StateSync(history=4)
+    for number in range(10):
+        host.player_joined(f"gracz{number}")
+
+    assert host.catch_up(2)['type'] == MSG_FULL  # Historia już tego nie obejmuje
+    assert host.catch_up(host.version + 1)['type'] == MSG_FULL  # Klient z innej gry
+    assert host.catch_up(host.version - 4)['type'] == MSG_DELTA
+    assert host.catch_up(host.version) == {'type': MSG_DELTA, 'base': 10, 'version': 10}
+
+    replica = StateReplica()
+    replica.apply_message(host.catch_up(2))
+    assert replica.version == host.version
+    assert state_of(replica) == state_of(host)
+
+
+def test_replica_reaches_host_state_despite_lost_messages():
+    rng = random.Random(3)
+    host = StateSync(history=8)
+    replica = StateReplica()
+    names = [f"gracz{number}" for number in range(6)]
+    answers = ["paryż", "rzym", "londyn", "berlin"]
+    for _ in range(500):
+        action = rng.randrange(5)
+        if action == 0:
+            message = host.player_joined(rng.choice(names))
+        elif action == 1:
+            message = host.player_left(rng.choice(names))
+        elif action == 2:
+            message = host.update_scores({rng.choice(names): rng.randrange(20)})
+        elif action == 3:
+            message = host.start_round(rng.randrange(10))
+        else:
+            group = {'answer': rng.choice(answers), 'players': rng.choice(names)}
+            if rng.random() < 0.3:
+                group = {'answer': group['answer'], 'removed': True}
+            message = host.update_groups([group])
+        if message is None or rng.random() < 0.3:
+            continue  # Zgubiona wiadomość
+        if not replica.apply_message(message):
+            assert replica.apply_message(host.catch_up(replica.sync_request()['version']))
+            assert replica.version == host.version
+            assert state_of(replica) == state_of(host)
+
+    assert replica.apply_message(host.catch_up(replica.version))
+    assert state_of(replica) == state_of(host)